@@ -10,12 +10,14 @@ import uuid
 
 from sqladmin import Admin, ModelView
 from sqladmin.authentication import AuthenticationBackend
+from starlette.concurrency import run_in_threadpool
 from starlette.requests import Request
 from starlette.responses import RedirectResponse
 from sqlalchemy import select
-from fastapi_users.password import PasswordHelper
+from sqlalchemy.orm import raiseload
 
 # from learn_fastapi_auth.database import engine, async_session_maker
+from learn_fastapi_auth.auth.users import password_helper
 from learn_fastapi_auth.models import User
 from learn_fastapi_auth.one.api import one
 
@@ -44,7 +46,7 @@ class AdminAuth(AuthenticationBackend):
         # Query user from database
         async with one.async_session_maker() as session:
             result = await session.execute(
-                select(User).where(User.email == email)
+                select(User).where(User.email == email).options(raiseload("*"))
             )
             user = result.scalar_one_or_none()
 
@@ -52,9 +54,8 @@ class AdminAuth(AuthenticationBackend):
                 return False
 
             # Verify password
-            password_helper = PasswordHelper()
-            verified, _ = password_helper.verify_and_update(
-                password, user.hashed_password
+            verified, _ = await run_in_threadpool(
+                password_helper.verify_and_update, password, user.hashed_password
             )
 
             if not verified:
@@ -91,7 +92,9 @@ class AdminAuth(AuthenticationBackend):
         # Verify user still exists and is still a superuser
         async with one.async_session_maker() as session:
             result = await session.execute(
-                select(User).where(User.id == admin_user_id)
+                select(User)
+                .where(User.id == admin_user_id)
+                .options(raiseload("*"))
             )
             user = result.scalar_one_or_none()
 
@@ -96,11 +96,24 @@ Usage Example
 """
 
 import dataclasses
-
-from firebase_admin import auth
-from firebase_admin.exceptions import FirebaseError
-
+import hashlib
+import os
+import stat
+import time
+import typing as T
+from pathlib import Path
+
+from ..logger import logger
+from ..models import hash_token
 from ..one.api import one
+from ..paths import PACKAGE_NAME
+from ..token_cache import TokenCache
+
+# firebase_admin (google-auth) and cachecontrol are imported inside the
+# functions that use them, so the app starts without loading them when
+# Firebase is disabled.
+if T.TYPE_CHECKING:  # pragma: no cover
+    import firebase_admin
 
 
 class FirebaseAuthError(Exception):
@@ -128,6 +141,170 @@ class FirebaseNotInitializedError(FirebaseAuthError):
     """
 
 
+class DiskCache:
+    """
+    Minimal file-per-key ``cachecontrol`` cache (implements the
+    ``cachecontrol.cache.BaseCache`` interface).
+
+    Used for the HTTP responses carrying Google's token signing certificates,
+    so a fresh process (e.g. a serverless cold start) reuses certificates
+    fetched by a previous one instead of downloading them before the first
+    :func:`verify_firebase_token` call. ``cachecontrol`` stores the response
+    headers with the body and still honors ``Cache-Control: max-age``.
+
+    :param directory: where cache files are written; must already exist,
+        see :func:`ensure_private_dir`.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> bytes | None:
+        try:
+            return self._path(key).read_bytes()
+        except OSError:
+            return None
+
+    def set(self, key: str, value: bytes, expires=None) -> None:
+        try:
+            # Write then rename, so concurrent readers never see a partial file
+            path = self._path(key)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_bytes(value)
+            tmp.replace(path)
+        except OSError:
+            pass
+
+    def delete(self, key: str) -> None:
+        try:
+            self._path(key).unlink()
+        except OSError:
+            pass
+
+    def close(self) -> None:
+        pass
+
+
+def get_cert_cache_dir(app: "firebase_admin.App") -> Path:
+    """
+    Directory of the on-disk certificate cache for ``app``.
+
+    ``one.env.firebase_cert_cache_dir`` when set (e.g. ``/tmp/...`` on
+    serverless platforms, where only ``/tmp`` is writable), otherwise under
+    the user's ``~/.cache``. One subdirectory per Firebase project, never the
+    shared temp dir itself.
+    """
+    if one.env.firebase_cert_cache_dir:
+        dir_root = Path(one.env.firebase_cert_cache_dir)
+    else:
+        dir_root = Path.home() / ".cache" / PACKAGE_NAME / "firebase_certs"
+    return dir_root / (app.project_id or app.name)
+
+
+def ensure_private_dir(directory: Path) -> Path:
+    """
+    Create ``directory`` with mode ``0700`` and check nobody else can use it.
+
+    Cached certificates decide which token signatures are trusted, so a
+    directory other users can write to (or that they created first) is
+    refused.
+
+    :raises PermissionError: if the directory is not owned by the current
+        user or is accessible to group or others.
+    """
+    directory = Path(directory)
+    directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+    st = directory.lstat()
+    if not stat.S_ISDIR(st.st_mode):
+        raise PermissionError(f"{directory} is not a directory")
+    if st.st_uid != os.getuid():
+        raise PermissionError(f"{directory} is not owned by the current user")
+    if st.st_mode & 0o077:
+        raise PermissionError(
+            f"{directory} is accessible to group or others "
+            f"(mode {stat.S_IMODE(st.st_mode):o})"
+        )
+    return directory
+
+
+def _get_token_verifier(app: "firebase_admin.App"):
+    """
+    Return the Admin SDK's internal ID token verifier for ``app``, or None.
+
+    ``auth._get_client`` and ``_token_verifier`` are private SDK attributes.
+    They are looked up with ``getattr`` so a ``firebase-admin`` release that
+    renames them only disables the certificate cache helpers below.
+    """
+    from firebase_admin import auth
+
+    get_client = getattr(auth, "_get_client", None)
+    if get_client is None:
+        return None
+    return getattr(get_client(app), "_token_verifier", None)
+
+
+def enable_cert_disk_cache(
+    app: "firebase_admin.App",
+    directory: Path | None = None,
+):
+    """
+    Persist Google's ID token signing certificates across process restarts.
+
+    Mounts a :class:`DiskCache` backed ``cachecontrol`` adapter on the HTTP
+    session the Admin SDK uses to fetch the certificates. The directory
+    defaults to :func:`get_cert_cache_dir` and must pass
+    :func:`ensure_private_dir`. Relies on SDK internals: when they are not
+    found, a warning is logged and nothing is mounted. Callers should treat
+    other failures as non-fatal too.
+    """
+    from cachecontrol import CacheControlAdapter
+
+    verifier = _get_token_verifier(app)
+    session = getattr(getattr(verifier, "request", None), "session", None)
+    if session is None:
+        logger.warning(
+            "Firebase cert disk cache skipped: "
+            "firebase_admin token verifier internals not found"
+        )
+        return
+    if directory is None:
+        directory = get_cert_cache_dir(app)
+    directory = ensure_private_dir(directory)
+    session.mount("https://", CacheControlAdapter(cache=DiskCache(directory)))
+
+
+def prewarm_cert_cache(app: "firebase_admin.App"):
+    """
+    Fetch Google's ID token signing certificates ahead of the first login.
+
+    Goes through the Admin SDK's own cache-aware HTTP session, so the
+    certificates land in the same cache :func:`verify_firebase_token` reads
+    from. Blocking network I/O and SDK internals: run it off the event loop
+    and treat failures as non-fatal. Skipped with a warning when the SDK
+    internals are not found.
+    """
+    verifier = _get_token_verifier(app)
+    request = getattr(verifier, "request", None)
+    cert_url = getattr(getattr(verifier, "id_token_verifier", None), "cert_url", None)
+    if request is None or cert_url is None:
+        logger.warning(
+            "Firebase certificate prewarm skipped: "
+            "firebase_admin token verifier internals not found"
+        )
+        return
+    request(cert_url)
+
+
+# Decoded claims of recently verified ID tokens, reused until min(exp, ttl)
+verified_firebase_tokens = TokenCache()
+
+# Upper bound on the ID token size; real Firebase ID tokens are ~1 KB
+MAX_ID_TOKEN_LENGTH = 8192
+
+
 def verify_firebase_token(id_token: str) -> dict:
     """
     Verify a Firebase ID Token and return the decoded claims.
@@ -139,6 +316,14 @@ def verify_firebase_token(id_token: str) -> dict:
     3. Verifies the token was issued for your Firebase project
     4. Returns the decoded user claims if everything checks out
 
+    Decoded claims are cached by token hash until the token's ``exp`` (at
+    most ``verified_firebase_tokens.ttl`` seconds), so a token re-sent
+    moments later skips the signature check.
+
+    Input that is not shaped like a JWT (three dot-separated parts, at most
+    :data:`MAX_ID_TOKEN_LENGTH` characters) is rejected before hashing or
+    signature verification.
+
     Args:
         id_token: The Firebase ID token from the frontend.
             This is a JWT string that looks like: "eyJhbGciOiJSUzI1NiIs..."
@@ -171,8 +356,21 @@ def verify_firebase_token(id_token: str) -> dict:
             "Firebase is not initialized. Call one.init_firebase() first."
         )
 
+    if len(id_token) > MAX_ID_TOKEN_LENGTH or id_token.count(".") != 2:
+        raise FirebaseTokenInvalidError("Firebase token is malformed.")
+
+    token_hash = hash_token(id_token)
+    decoded_token = verified_firebase_tokens.get(token_hash)
+    if decoded_token is not None:
+        return decoded_token
+
+    from firebase_admin import auth
+    from firebase_admin.exceptions import FirebaseError
+
     try:
         decoded_token = auth.verify_id_token(id_token)
+        remaining = decoded_token.get("exp", 0) - time.time()
+        verified_firebase_tokens.put(token_hash, decoded_token, remaining)
         return decoded_token
     except auth.ExpiredIdTokenError:
         raise FirebaseTokenInvalidError("Firebase token has expired.")
@@ -7,7 +7,8 @@ Provides user management, authentication backends, and user manager setup.
 """
 
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+import functools
+from typing import Optional, Sequence
 import uuid
 
 from fastapi import Depends, Request
@@ -17,19 +18,53 @@ from fastapi_users.authentication import (
     BearerTransport,
     JWTStrategy,
 )
+from fastapi_users.password import PasswordHelper
 from fastapi_users_db_sqlalchemy import SQLAlchemyUserDatabase
-from sqlalchemy import select
+from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
+from pwdlib.hashers.bcrypt import BcryptHasher
+from sqlalchemy import Select, delete, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload
 
 from learn_fastapi_auth.one.api import one
-from learn_fastapi_auth.models import Token, User, UserData
+from learn_fastapi_auth.models import Token, User, UserData, hash_token
+from learn_fastapi_auth.token_cache import TokenCache
+
+
+# argon2id at the OWASP baseline (19 MiB, 2 passes, 1 lane) instead of the
+# argon2-cffi default (64 MiB, 3 passes, 4 lanes). bcrypt is kept so older
+# hashes still verify; verify_and_update() rehashes them on next login.
+password_helper = PasswordHelper(
+    PasswordHash(
+        (
+            Argon2Hasher(time_cost=2, memory_cost=19456, parallelism=1),
+            BcryptHasher(),
+        )
+    )
+)
+
+
+class UserDatabase(SQLAlchemyUserDatabase[User, uuid.UUID]):
+    """
+    User database adapter that forbids lazy loading on fetched users.
+
+    Every user lookup made by fastapi-users (including the per-request
+    ``current_user`` dependency) gets ``raiseload("*")``. Touching
+    ``user.user_data`` / ``user.tokens`` / ``user.refresh_tokens`` on such a
+    user raises instead of silently issuing an extra SELECT. Code that needs
+    a relationship must query it explicitly.
+    """
+
+    async def _get_user(self, statement: Select) -> Optional[User]:
+        return await super()._get_user(statement.options(raiseload("*")))
 
 
 async def get_user_db(
     session: AsyncSession = Depends(one.get_async_session),
 ):
     """Dependency for getting the user database."""
-    yield SQLAlchemyUserDatabase(session, User)
+    yield UserDatabase(session, User)
 
 
 class UserManager(UUIDIDMixin, BaseUserManager[User, uuid.UUID]):
@@ -59,7 +94,6 @@ class UserManager(UUIDIDMixin, BaseUserManager[User, uuid.UUID]):
         user.has_set_password = True  # User registered with their own password
         session.add(user)
         await session.commit()
-        await session.refresh(user)
         print(f"User {user.id} set to inactive until email verified.")
 
     async def on_after_forgot_password(
@@ -125,17 +159,17 @@ class UserManager(UUIDIDMixin, BaseUserManager[User, uuid.UUID]):
             session.add(user_data)
             print(f"Created UserData for user {user.id}")
 
+        # The sessionmaker uses expire_on_commit=False and User fetches its
+        # server-side updated_at at flush (eager_defaults), so every attribute
+        # fastapi-users serializes is still loaded: no refresh needed.
         await session.commit()
-        # Refresh user to ensure all attributes (like updated_at) are loaded
-        # This prevents "MissingGreenlet" error when fastapi-users serializes the response
-        await session.refresh(user)
 
 
 async def get_user_manager(
     user_db: SQLAlchemyUserDatabase = Depends(get_user_db),
 ):
     """Dependency for getting the user manager."""
-    yield UserManager(user_db)
+    yield UserManager(user_db, password_helper)
 
 
 # =============================================================================
@@ -144,8 +178,14 @@ async def get_user_manager(
 bearer_transport = BearerTransport(tokenUrl="api/auth/login")
 
 
+@functools.cache
 def get_jwt_strategy() -> JWTStrategy:
-    """Get JWT strategy with configured lifetime."""
+    """
+    Get JWT strategy with configured lifetime.
+
+    The strategy is stateless (secret, lifetime, algorithm), so one instance
+    is shared by all requests instead of being rebuilt for each of them.
+    """
     return JWTStrategy(
         secret=one.env.secret_key,
         lifetime_seconds=one.env.access_token_lifetime,
@@ -174,6 +214,10 @@ current_verified_user = fastapi_users.current_user(active=True, verified=True)
 # =============================================================================
 # Token Database Management
 # =============================================================================
+# Access tokens recently found valid in the database, value is the user id
+valid_tokens = TokenCache()
+
+
 async def store_token(
     session: AsyncSession,
     token_str: str,
@@ -183,39 +227,139 @@ async def store_token(
     expires_at = datetime.now(timezone.utc) + timedelta(
         seconds=one.env.access_token_lifetime
     )
-    token = Token(token=token_str, user_id=user_id, expires_at=expires_at)
+    token = Token(
+        token_hash=hash_token(token_str),
+        user_id=user_id,
+        expires_at=expires_at,
+    )
     session.add(token)
     await session.commit()
     return token
 
 
+async def store_tokens(
+    session: AsyncSession,
+    token_strs: Sequence[str],
+    user_id: uuid.UUID,
+) -> int:
+    """
+    Store several JWT tokens of a user with one multi-row INSERT and a
+    single commit. Returns the number of tokens stored.
+    """
+    if not token_strs:
+        return 0
+    expires_at = datetime.now(timezone.utc) + timedelta(
+        seconds=one.env.access_token_lifetime
+    )
+    await session.execute(
+        insert(Token),
+        [
+            {
+                "token_hash": hash_token(token_str),
+                "user_id": user_id,
+                "expires_at": expires_at,
+            }
+            for token_str in token_strs
+        ],
+    )
+    await session.commit()
+    return len(token_strs)
+
+
 async def delete_token(
     session: AsyncSession,
     token_str: str,
 ) -> bool:
-    """Delete a token from the database (logout)."""
-    result = await session.execute(select(Token).where(Token.token == token_str))
-    token = result.scalar_one_or_none()
-    if token:
-        await session.delete(token)
-        await session.commit()
-        return True
-    return False
+    """
+    Delete a token from the database (logout).
+
+    One DELETE statement, its rowcount tells whether the token existed.
+    """
+    token_hash = hash_token(token_str)
+    result = await session.execute(
+        delete(Token)
+        .where(Token.token_hash == token_hash)
+        .execution_options(synchronize_session=False)
+    )
+    await session.commit()
+    # Dropped only once the DELETE is committed: a concurrent lookup
+    # could otherwise still read the row and cache the token again
+    valid_tokens.discard_token(token_hash)
+    return result.rowcount > 0
 
 
 async def validate_token_in_db(
     session: AsyncSession,
     token_str: str,
+    *,
+    now: Optional[datetime] = None,
 ) -> bool:
-    """Check if a token exists and is not expired."""
-    result = await session.execute(select(Token).where(Token.token == token_str))
-    token = result.scalar_one_or_none()
-    if token:
+    """
+    Check if a token exists and is not expired.
+
+    Positive results are cached in :data:`valid_tokens`, so repeated requests
+    with the same token skip the database for up to ``valid_tokens.ttl``
+    seconds.
+
+    :param now: timezone-aware request time. Callers that already captured
+        it at request ingress pass it in; defaults to the current UTC time.
+    """
+    token_hash = hash_token(token_str)
+    if valid_tokens.get(token_hash) is not None:
+        return True
+    # Primary key probe fetching only the two columns the cache needs, no
+    # Token object is materialized
+    result = await session.execute(
+        select(Token.user_id, Token.expires_at).where(Token.token_hash == token_hash)
+    )
+    row = result.one_or_none()
+    if row is not None:
+        user_id, expires_at = row
         # Handle both timezone-aware and naive datetimes (SQLite stores naive)
-        now = datetime.now(timezone.utc)
-        expires_at = token.expires_at
+        if now is None:
+            now = datetime.now(timezone.utc)
         if expires_at.tzinfo is None:
             expires_at = expires_at.replace(tzinfo=timezone.utc)
         if expires_at > now:
+            remaining = (expires_at - now).total_seconds()
+            valid_tokens.put(token_hash, user_id, remaining)
             return True
     return False
+
+
+async def revoke_all_user_tokens(
+    session: AsyncSession,
+    user_id: uuid.UUID,
+) -> int:
+    """
+    Delete all access tokens of a user in one statement (logout everywhere).
+
+    Uses a bulk Core DELETE without session synchronization, so no rows are
+    loaded into the identity map.
+
+    Other worker processes may keep accepting the revoked tokens from their
+    :data:`valid_tokens` cache for up to ``valid_tokens.ttl`` seconds.
+    """
+    result = await session.execute(
+        delete(Token)
+        .where(Token.user_id == user_id)
+        .execution_options(synchronize_session=False)
+    )
+    await session.commit()
+    # After the commit, see delete_token
+    valid_tokens.discard_user(user_id)
+    return result.rowcount
+
+
+async def cleanup_expired_access_tokens(
+    session: AsyncSession,
+) -> int:
+    """Delete all expired access tokens in one bulk DELETE statement."""
+    now = datetime.now(timezone.utc)
+    result = await session.execute(
+        delete(Token)
+        .where(Token.expires_at <= now)
+        .execution_options(synchronize_session=False)
+    )
+    await session.commit()
+    return result.rowcount
@@ -35,6 +35,46 @@ class BotoSesEnum(BaseBotoSesEnum):
     operations while enforcing security boundaries and preventing accidental cross-environment access.
     """
 
+    @cached_property
+    def _env_bsm_cache(self) -> dict[str, "BotoSesManager"]:
+        return dict()
+
+    @cached_property
+    def _env_aws_console_cache(self) -> dict[str, "AWSConsole"]:
+        return dict()
+
+    def get_env_bsm(
+        self,
+        env_name: str,
+        assume_role_kwargs: dict | None = None,
+    ) -> "BotoSesManager":
+        """
+        BotoSesManager for the given environment, created once per process.
+
+        Credential resolution (and the STS AssumeRole in CI) only happens on
+        the first call for each env. Calls with custom ``assume_role_kwargs``
+        are not cached.
+        """
+        if assume_role_kwargs is not None:
+            return super().get_env_bsm(env_name, assume_role_kwargs)
+        try:
+            return self._env_bsm_cache[env_name]
+        except KeyError:
+            bsm = super().get_env_bsm(env_name)
+            self._env_bsm_cache[env_name] = bsm
+            return bsm
+
+    def get_env_aws_console(self, env_name: str) -> "AWSConsole":
+        """
+        AWSConsole for the given environment, created once per process.
+        """
+        try:
+            return self._env_aws_console_cache[env_name]
+        except KeyError:
+            aws_console = AWSConsole.from_bsm(self.get_env_bsm(env_name))
+            self._env_aws_console_cache[env_name] = aws_console
+            return aws_console
+
     @cached_property
     def bsm_dev(self):
         """
@@ -108,7 +148,7 @@ class BotoSesEnum(BaseBotoSesEnum):
         """
         AWSConsole for the devops environment.
         """
-        return AWSConsole.from_bsm(self.bsm)
+        return AWSConsole.from_bsm(self.bsm_devops)
 
     @classmethod
     def new(cls):
@@ -78,6 +78,7 @@ class Env(
 
     # Firebase Authentication
     firebase_enabled: bool | None = dataclasses.field(default=None)
+    firebase_cert_cache_dir: str | None = dataclasses.field(default=None)
 
 
 @dataclasses.dataclass
@@ -81,11 +81,32 @@ Pass the lifespan function to FastAPI::
     app = FastAPI(lifespan=lifespan)
 """
 
+import asyncio
+import contextlib
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
+from ..auth.firebase import prewarm_cert_cache
+from ..logger import logger, start_queue_logging, stop_queue_logging
 from ..one.api import one
+from ..refresh_token import cleanup_expired_tokens
+
+# Seconds between two runs of the expired refresh token cleanup
+TOKEN_CLEANUP_INTERVAL = 3600
+
+
+async def _cleanup_expired_tokens_forever(interval: float = TOKEN_CLEANUP_INTERVAL):
+    """
+    Delete expired refresh tokens every ``interval`` seconds until cancelled.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with one.async_session_maker() as session:
+                await cleanup_expired_tokens(session)
+        except Exception as e:  # keep the loop alive on transient DB errors
+            logger.warning(f"Expired refresh token cleanup failed: {e!r}")
 
 
 @asynccontextmanager
@@ -97,11 +118,18 @@ async def lifespan(app: FastAPI):
     a context that lives until the application shuts down.
 
     Startup (before yield):
+        - Moves log output to a background thread
         - Creates database tables if they don't exist
-        - Initializes Firebase Admin SDK if enabled
+        - Pre-warms the database connection pool (skipped on Vercel)
+        - Deletes expired refresh tokens, then again every hour in the
+          background
+        - Initializes Firebase Admin SDK if enabled and pre-fetches its
+          token signing certificates
 
     Shutdown (after yield):
-        - Add cleanup tasks here when needed (e.g., close connection pools)
+        - Stops the background token cleanup
+        - Closes the database connection pool
+        - Flushes pending log records
 
     Args:
         app: The FastAPI application instance.
@@ -126,13 +154,25 @@ async def lifespan(app: FastAPI):
     # =========================================================================
     # Startup
     # =========================================================================
+    log_listener = start_queue_logging()
     await one.create_db_and_tables()
-    one.init_firebase()
+    await one.prewarm_pool()
+    async with one.async_session_maker() as session:
+        await cleanup_expired_tokens(session)
+    cleanup_task = asyncio.create_task(_cleanup_expired_tokens_forever())
+    if one.init_firebase():
+        try:
+            await asyncio.to_thread(prewarm_cert_cache, one.firebase_app)
+        except Exception as e:
+            logger.warning(f"Firebase certificate prewarm failed: {e!r}")
 
     yield
 
     # =========================================================================
     # Shutdown
     # =========================================================================
-    # Add cleanup tasks here if needed, for example:
-    # await one.async_engine.dispose()
+    cleanup_task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await cleanup_task
+    await one.async_engine.dispose()
+    stop_queue_logging(log_listener)
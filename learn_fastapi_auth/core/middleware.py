@@ -8,8 +8,10 @@ This module centralizes all middleware setup for the FastAPI application.
 See :func:`setup_all_middleware` for the complete middleware stack and execution order.
 """
 
+import functools
 import json
 import os
+import re
 import uuid
 
 import jwt
@@ -17,11 +19,16 @@ from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from slowapi.middleware import SlowAPIMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from ..csrf import setup_csrf_protection
 from ..one.api import one
-from ..ratelimit import create_path_rate_limit_middleware, setup_rate_limiting
-from ..refresh_token import create_refresh_token, get_refresh_token_cookie_settings
+from ..ratelimit import PathRateLimitMiddleware, setup_rate_limiting
+from ..refresh_token import (
+    create_refresh_token,
+    get_refresh_token_cookie_settings,
+)
+from ..routers.health import HEALTH_BODY
 
 
 def setup_all_middleware(app: FastAPI) -> None:
@@ -36,6 +43,7 @@ def setup_all_middleware(app: FastAPI) -> None:
     - **Path Rate Limiting** (:func:`setup_path_rate_limits`): Rate limits for fastapi-users routes
     - **CSRF Protection** (:func:`setup_csrf`): Prevent cross-site request forgery attacks
     - **Login Middleware** (:func:`setup_login_middleware`): Add refresh token cookie after login
+    - **Health Check** (:func:`setup_health_check`): Answer ``GET /health`` before everything else
 
     Execution Order (Important!)
     ============================
@@ -48,12 +56,13 @@ def setup_all_middleware(app: FastAPI) -> None:
         2. Rate Limiting
         3. Path Rate Limiting
         4. CSRF
-        5. Login          ← added last
+        5. Login
+        6. Health Check   ← added last
 
     **Request processing order** (reversed)::
 
-        Request  →  CORS → RateLimit → PathLimit → CSRF → Login → Route Handler
-        Response ←  CORS ← RateLimit ← PathLimit ← CSRF ← Login ← Route Handler
+        Request  →  Health → CORS → RateLimit → PathLimit → CSRF → Login → Route Handler
+        Response ←           CORS ← RateLimit ← PathLimit ← CSRF ← Login ← Route Handler
 
     Why this order?
 
@@ -61,6 +70,8 @@ def setup_all_middleware(app: FastAPI) -> None:
     2. **Rate limiting early**: Block abusive requests before expensive operations
     3. **CSRF before business logic**: Security check before processing
     4. **Login last**: Needs to intercept response after route handler completes
+    5. **Health check outermost**: ``GET /health`` is answered right away and
+       never reaches the rest of the stack
     """
     # CORS (outermost - processes first on request, last on response)
     setup_cors(app)
@@ -77,6 +88,53 @@ def setup_all_middleware(app: FastAPI) -> None:
     # Login middleware (innermost - processes last on request, first on response)
     setup_login_middleware(app)
 
+    # Health check short-circuit, see HealthCheckMiddleware
+    setup_health_check(app)
+
+
+def setup_health_check(app: FastAPI) -> None:
+    """
+    Configure the ``/health`` short-circuit.
+
+    See :class:`HealthCheckMiddleware`.
+    """
+    app.add_middleware(HealthCheckMiddleware)
+
+
+class HealthCheckMiddleware:
+    """
+    Pure ASGI middleware answering ``GET /health`` with a canned response.
+
+    Liveness probes and load balancers hit ``/health`` constantly. Added as
+    the outermost user middleware, it replies before the rate limiters, CSRF,
+    routing and dependency resolution run; every other request is passed
+    through untouched.
+    """
+
+    _START = {
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(HEALTH_BODY)).encode()),
+        ],
+    }
+    _BODY = {"type": "http.response.body", "body": HEALTH_BODY}
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] == "http"
+            and scope["path"] == "/health"
+            and scope["method"] == "GET"
+        ):
+            await send(self._START)
+            await send(self._BODY)
+            return
+        await self.app(scope, receive, send)
+
 
 def setup_cors(app: FastAPI) -> None:
     """
@@ -105,12 +163,38 @@ def setup_cors(app: FastAPI) -> None:
     - ``*.vercel.app`` - Vercel deployments (when VERCEL env is set)
     - Custom origins from ``CORS_ORIGINS`` environment variable
 
+    Origins are computed once per process by :func:`_get_cors_origins`.
+
     Important settings:
 
     - ``allow_credentials=True`` - Required for cookies (refresh token)
     - ``allow_methods=["*"]`` - Allow all HTTP methods
     - ``allow_headers=["*"]`` - Allow all headers (including Authorization)
     """
+    allow_origins, allow_origin_regex = _get_cors_origins()
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=list(allow_origins),
+        allow_origin_regex=allow_origin_regex,
+        allow_credentials=True,  # Allow cookies for refresh token
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+
+@functools.cache
+def _get_cors_origins() -> tuple[tuple[str, ...], str | None]:
+    """
+    Build the CORS origin settings once per process.
+
+    ``CORSMiddleware`` only compares ``allow_origins`` entries literally,
+    so wildcard entries like ``https://*.vercel.app`` are folded into a
+    single ``allow_origin_regex`` instead.
+
+    Returns:
+        Tuple of (exact origins, origin regex or None)
+    """
     cors_origins = [
         "http://localhost:3000",  # Next.js dev server
         "http://127.0.0.1:3000",
@@ -130,13 +214,14 @@ def setup_cors(app: FastAPI) -> None:
     if extra_origins:
         cors_origins.extend([o.strip() for o in extra_origins.split(",") if o.strip()])
 
-    app.add_middleware(
-        CORSMiddleware,
-        allow_origins=cors_origins,
-        allow_credentials=True,  # Allow cookies for refresh token
-        allow_methods=["*"],
-        allow_headers=["*"],
-    )
+    exact_origins = tuple(o for o in cors_origins if "*" not in o or o == "*")
+    wildcard_patterns = [
+        re.escape(o).replace(r"\*", r"[a-zA-Z0-9-]+")
+        for o in cors_origins
+        if "*" in o and o != "*"
+    ]
+    origin_regex = "|".join(wildcard_patterns) if wildcard_patterns else None
+    return exact_origins, origin_regex
 
 
 def setup_slowapi_middleware(app: FastAPI) -> None:
@@ -214,12 +299,19 @@ def setup_path_rate_limits(app: FastAPI) -> None:
     | ``/api/auth/forgot-password`` | 3/hour  | Prevent email bombing          |
     +---------------------------+-------------+--------------------------------+
     """
-    path_rate_limits = {
+    app.add_middleware(PathRateLimitMiddleware, path_limits=_get_path_rate_limits())
+
+
+@functools.cache
+def _get_path_rate_limits() -> dict[str, str]:
+    """
+    Build the path to rate limit mapping once per process.
+    """
+    return {
         "/api/auth/login": one.env.rate_limit_login,
         "/api/auth/register": one.env.rate_limit_register,
         "/api/auth/forgot-password": one.env.rate_limit_forgot_password,
     }
-    app.middleware("http")(create_path_rate_limit_middleware(path_rate_limits))
 
 
 def setup_csrf(app: FastAPI) -> None:
@@ -20,15 +20,61 @@ Important Notes:
 - API endpoints using Bearer token authentication are exempt
 """
 
+import functools
 import re
 from typing import List, Optional, Set
 
 from fastapi import Request
+from starlette.datastructures import URL
+from starlette.types import ASGIApp, Receive, Scope, Send
 from starlette_csrf import CSRFMiddleware
 
 from .one.api import one
 
 
+class FastCSRFMiddleware(CSRFMiddleware):
+    """
+    CSRFMiddleware that skips the regex engine for the common exempt paths.
+
+    Almost all traffic in this app goes to ``/api/*`` (Bearer token auth),
+    so a plain ``str.startswith`` check passes those requests straight to the
+    app; static files and the fixed health / API docs paths are a set lookup.
+    They also skip the CSRF cookie on the response, which the frontend
+    never reads from these paths. Every other path goes through the normal
+    :class:`~starlette_csrf.CSRFMiddleware` logic, except that the exempt
+    patterns are checked with one combined regex instead of one by one.
+    """
+
+    bypass_prefixes: tuple[str, ...] = ("/api/", "/static/")
+    bypass_paths: frozenset[str] = frozenset(
+        {
+            "/health",
+            "/docs",
+            "/docs/oauth2-redirect",
+            "/redoc",
+            "/openapi.json",
+        }
+    )
+
+    def __init__(self, app: ASGIApp, secret: str, **kwargs) -> None:
+        super().__init__(app, secret, **kwargs)
+        self.exempt_matcher = (
+            combine_patterns(self.exempt_urls) if self.exempt_urls else None
+        )
+
+    def _url_is_exempt(self, url: URL) -> bool:
+        if self.exempt_matcher is None:
+            return False
+        return self.exempt_matcher.match(url.path) is not None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        path = scope.get("path", "")
+        if path.startswith(self.bypass_prefixes) or path in self.bypass_paths:
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
 def get_csrf_token(request: Request) -> Optional[str]:
     """
     Get CSRF token from request cookies.
@@ -48,10 +94,14 @@ def get_csrf_token(request: Request) -> Optional[str]:
     return request.cookies.get(one.env.csrf_cookie_name)
 
 
+@functools.cache
 def create_csrf_exempt_patterns() -> List[re.Pattern]:
     """
     Create regex patterns for URLs that should be exempt from CSRF protection.
 
+    The patterns are compiled once per process; every call returns the same
+    list, so callers must not mutate it.
+
     Exempt URLs include:
     - API endpoints that use Bearer token authentication (already protected)
     - Health check endpoint
@@ -79,6 +129,33 @@ def create_csrf_exempt_patterns() -> List[re.Pattern]:
     return exempt_patterns
 
 
+def combine_patterns(patterns: List[re.Pattern]) -> re.Pattern:
+    """
+    Combine regex patterns into a single alternation.
+
+    ``combine_patterns(patterns).match(path)`` is truthy exactly when
+    ``any(p.match(path) for p in patterns)`` is, but scans the path once.
+
+    Args:
+        patterns: Compiled regex patterns
+
+    Returns:
+        One compiled regex pattern
+    """
+    return re.compile("|".join(f"(?:{p.pattern})" for p in patterns))
+
+
+@functools.cache
+def get_csrf_exempt_matcher() -> re.Pattern:
+    """
+    Get a single compiled regex matching every CSRF exempt URL.
+
+    Returns:
+        :func:`create_csrf_exempt_patterns` combined by :func:`combine_patterns`
+    """
+    return combine_patterns(create_csrf_exempt_patterns())
+
+
 def create_csrf_required_patterns() -> Optional[List[re.Pattern]]:
     """
     Create regex patterns for URLs that require CSRF protection.
@@ -103,7 +180,7 @@ def setup_csrf_protection(app, secret: str) -> None:
     """
     Configure CSRF protection for a FastAPI application.
 
-    This adds the CSRFMiddleware with appropriate configuration.
+    This adds the :class:`FastCSRFMiddleware` with appropriate configuration.
     The middleware will:
     - Set a CSRF cookie on responses
     - Validate CSRF token on state-changing requests (POST, PUT, DELETE, PATCH)
@@ -120,9 +197,9 @@ def setup_csrf_protection(app, secret: str) -> None:
         setup_csrf_protection(app, config.secret_key)
     """
     app.add_middleware(
-        CSRFMiddleware,
+        FastCSRFMiddleware,
         secret=secret,
-        exempt_urls=create_csrf_exempt_patterns(),
+        exempt_urls=list(create_csrf_exempt_patterns()),
         required_urls=create_csrf_required_patterns(),
         cookie_name=one.env.csrf_cookie_name,
         cookie_secure=one.env.csrf_cookie_secure,
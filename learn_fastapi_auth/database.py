@@ -6,6 +6,8 @@ Database connection and session management.
 Provides async SQLAlchemy engine, session factory, and database initialization utilities.
 """
 
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import DeclarativeBase
 
 
@@ -13,3 +15,18 @@ class Base(DeclarativeBase):
     """Base class for all SQLAlchemy models."""
 
     pass
+
+
+@event.listens_for(Engine, "connect")
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    """
+    Turn on foreign key enforcement for SQLite connections.
+
+    SQLite ignores ``ON DELETE CASCADE`` unless ``PRAGMA foreign_keys`` is on.
+    The models rely on it (``passive_deletes=True``), so local SQLite
+    behaves the same as Postgres.
+    """
+    if "sqlite" in type(dbapi_connection).__module__:
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
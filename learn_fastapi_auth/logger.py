@@ -1,5 +1,9 @@
 # -*- coding: utf-8 -*-
 
+import logging
+import logging.handlers
+import queue
+
 from vislog import VisLog
 
 from .paths import PACKAGE_NAME
@@ -10,4 +14,34 @@ logger = VisLog(
 )
 """
 Project level logger.
-"""
\ No newline at end of file
+"""
+
+
+def start_queue_logging() -> logging.handlers.QueueListener:
+    """
+    Move the project logger's handlers behind a queue.
+
+    Records logged from the event loop (via :data:`logger` or any
+    ``logging.getLogger(__name__)`` child of the package) are only put on an
+    in-memory queue; a listener thread does the actual stdout writes, so a
+    slow stream never blocks request handling.
+
+    Returns the started listener, pass it to :func:`stop_queue_logging`.
+    """
+    package_logger = logging.getLogger(PACKAGE_NAME)
+    handlers = list(package_logger.handlers)
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    package_logger.handlers = [logging.handlers.QueueHandler(log_queue)]
+    listener.start()
+    return listener
+
+
+def stop_queue_logging(listener: logging.handlers.QueueListener):
+    """
+    Flush pending records and restore the original handlers.
+    """
+    listener.stop()
+    logging.getLogger(PACKAGE_NAME).handlers = list(listener.handlers)
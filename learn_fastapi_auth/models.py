@@ -15,17 +15,39 @@ Model Relationships:
 - :class:`User` ↔ :class`UserData`: One-to-One. Each user has exactly one UserData record for their profile content.
 - :class:`User` ↔ :class`Token`: One-to-Many. A user can have multiple active access tokens (multi-device login).
 - :class:`User` ↔ :class`RefreshToken`: One-to-Many. A user can have multiple refresh tokens for token rotation across devices.
+
+Token Storage:
+
+- :class:`Token` and :class:`RefreshToken` never store the raw token string.
+  They are keyed by its 32-byte SHA-256 digest (see :func:`hash_token`),
+  which keeps the primary key index small and fixed-width.
+- The digest is the natural key and is computed in Python before the INSERT,
+  so there is no surrogate id: no server-side key generation, no second
+  unique index on the token, and nothing to read back after inserting.
 """
 
 from datetime import datetime
+import hashlib
 import typing as T
 import uuid
 
 from fastapi_users_db_sqlalchemy import SQLAlchemyBaseUserTableUUID
+from fastapi_users_db_sqlalchemy.generics import GUID
 import sqlalchemy as sa
 import sqlalchemy.orm as orm
 
 from .database import Base
+from .utils import uuid7
+
+
+def hash_token(token_str: str) -> bytes:
+    """
+    Return the SHA-256 digest used as the primary key of token tables.
+
+    The raw token only lives on the client; the database stores its digest,
+    so lookups hash the incoming token and compare 32-byte keys.
+    """
+    return hashlib.sha256(token_str.encode("utf-8")).digest()
 
 
 class User(SQLAlchemyBaseUserTableUUID, Base):
@@ -33,24 +55,42 @@ class User(SQLAlchemyBaseUserTableUUID, Base):
     User model managed by fastapi-users.
 
     Inherits from SQLAlchemyBaseUserTableUUID which provides:
-    - id: UUID primary key
+    - id: UUID primary key (overridden to default to time-ordered UUID v7)
     - email: unique email address
     - hashed_password: password hash
     - is_active: account active status
     - is_superuser: admin status
     - is_verified: email verification status
 
+    :param id: UUID v7 default so new users append to the end of the PK index
+        (and the ``user_id`` FK indexes) instead of random pages.
     :param created_at: server_default ensures consistent timestamp even in bulk inserts.
     :param updated_at: onupdate auto-tracks modifications without application code.
     :param firebase_uid: nullable because password-based users don't have Firebase identity.
+        Kept as ``String(128)``: auto-generated UIDs are 28 chars, but the
+        Admin SDK accepts custom UIDs up to 128. Its unique B-tree index also
+        serves the equality lookup on OAuth login, so no separate hash index.
     :param user_data: One-to-One, cascade delete ensures no orphan records.
+        Lazy loaded (the default), so user lookups only read ``users``; queries
+        that need the content ask for it with ``joinedload`` / ``selectinload``.
     :param tokens: One-to-Many, cascade delete revokes all tokens when user is deleted.
     :param refresh_tokens: One-to-Many, same cascade behavior as tokens.
+
+    ``eager_defaults`` fetches server-generated ``created_at`` / ``updated_at``
+    with ``RETURNING`` during the flush, so they stay loaded after commit and
+    no ``session.refresh()`` round-trip is needed before serializing the user.
+
+    All three relationships use ``passive_deletes=True``: deleting a user emits
+    a single DELETE and lets the database ``ON DELETE CASCADE`` remove the
+    children, instead of SELECTing and deleting them row by row.
     """
 
     __tablename__ = "users"
+    __mapper_args__ = {"eager_defaults": True}
 
     # fmt: off
+    id: orm.Mapped[uuid.UUID] = orm.mapped_column(GUID, primary_key=True, default=uuid7)
+
     # Additional fields beyond fastapi-users defaults
     created_at: orm.Mapped[datetime] = orm.mapped_column(sa.DateTime(timezone=True), server_default=sa.func.now())
     updated_at: orm.Mapped[datetime] = orm.mapped_column(sa.DateTime(timezone=True), server_default=sa.func.now(), onupdate=sa.func.now())
@@ -66,9 +106,9 @@ class User(SQLAlchemyBaseUserTableUUID, Base):
     has_set_password: orm.Mapped[bool] = orm.mapped_column(sa.Boolean, default=False, server_default=sa.text("false"))
 
     # Relationships
-    user_data: orm.Mapped[T.Optional["UserData"]] = orm.relationship(back_populates="user", cascade="all, delete-orphan", uselist=False)
-    tokens: orm.Mapped[list["Token"]] = orm.relationship(back_populates="user", cascade="all, delete-orphan")
-    refresh_tokens: orm.Mapped[list["RefreshToken"]] = orm.relationship(back_populates="user", cascade="all, delete-orphan")
+    user_data: orm.Mapped[T.Optional["UserData"]] = orm.relationship(back_populates="user", cascade="all, delete-orphan", passive_deletes=True, uselist=False)
+    tokens: orm.Mapped[list["Token"]] = orm.relationship(back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    refresh_tokens: orm.Mapped[list["RefreshToken"]] = orm.relationship(back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
     # fmt: on
 
 
@@ -102,15 +142,26 @@ class Token(Base):
 
     Stores tokens in database for validation and revocation support.
 
-    :param token: uses token string as PK for O(1) lookup during validation.
+    :param token_hash: SHA-256 of the token string (see :func:`hash_token`),
+        a fixed 32-byte PK for O(1) lookup during validation.
     :param expires_at: enables efficient cleanup of expired tokens via scheduled job.
     :param user: Many-to-One back-reference, ondelete CASCADE auto-revokes on user deletion.
+
+    The composite ``(user_id, expires_at)`` index backs "revoke all tokens
+    of a user". The expired token cleanup (``expires_at <= now``) cannot seek
+    on it, ``user_id`` leads, so ``expires_at`` has its own index.
     """
 
     __tablename__ = "tokens"
+    __table_args__ = (
+        # Serves per-user revocation (user_id = ?)
+        sa.Index("ix_tokens_user_expires", "user_id", "expires_at"),
+        # Serves the expired cleanup range scan (expires_at <= ?)
+        sa.Index("ix_tokens_expires", "expires_at"),
+    )
 
     # fmt: off
-    token: orm.Mapped[str] = orm.mapped_column(sa.String(500), primary_key=True)
+    token_hash: orm.Mapped[bytes] = orm.mapped_column(sa.LargeBinary(32), primary_key=True)
     user_id: orm.Mapped[uuid.UUID] = orm.mapped_column(sa.ForeignKey("users.id", ondelete="CASCADE"))
     created_at: orm.Mapped[datetime] = orm.mapped_column(sa.DateTime(timezone=True), server_default=sa.func.now())
     expires_at: orm.Mapped[datetime] = orm.mapped_column(sa.DateTime(timezone=True))
@@ -132,18 +183,32 @@ class RefreshToken(Base):
     - Revocation support (logout from all devices)
     - Token rotation (optional security enhancement)
 
-    :param token: uses token string as PK for O(1) lookup during refresh.
-    :param expires_at: longer TTL than access tokens, enables periodic re-auth.
+    :param token_hash: SHA-256 of the token string (see :func:`hash_token`),
+        a fixed 32-byte PK for O(1) lookup during refresh.
+    :param expires_at: Unix epoch seconds (UTC), longer TTL than access
+        tokens, enables periodic re-auth. Stored as an integer so validation
+        is a plain ``int`` comparison with no timezone handling (SQLite
+        drops tzinfo from ``DateTime`` columns).
     :param user: Many-to-One back-reference, ondelete CASCADE revokes all on user deletion.
+
+    The composite ``(user_id, expires_at)`` index backs logout from all
+    devices. The ``expires_at`` index backs the batched range scan of
+    :func:`~learn_fastapi_auth.refresh_token.cleanup_expired_tokens`.
     """
 
     __tablename__ = "refresh_tokens"
+    __table_args__ = (
+        # Serves per-user revocation (user_id = ?)
+        sa.Index("ix_refresh_tokens_user_expires", "user_id", "expires_at"),
+        # Serves the expired cleanup range scan (expires_at <= ?)
+        sa.Index("ix_refresh_tokens_expires", "expires_at"),
+    )
 
     # fmt: off
-    token: orm.Mapped[str] = orm.mapped_column(sa.String(500), primary_key=True)
+    token_hash: orm.Mapped[bytes] = orm.mapped_column(sa.LargeBinary(32), primary_key=True)
     user_id: orm.Mapped[uuid.UUID] = orm.mapped_column(sa.ForeignKey("users.id", ondelete="CASCADE"))
     created_at: orm.Mapped[datetime] = orm.mapped_column(sa.DateTime(timezone=True), server_default=sa.func.now())
-    expires_at: orm.Mapped[datetime] = orm.mapped_column(sa.DateTime(timezone=True))
+    expires_at: orm.Mapped[int] = orm.mapped_column(sa.BigInteger)
 
     # Relationship back to User
     user: orm.Mapped["User"] = orm.relationship(back_populates="refresh_tokens")
@@ -9,13 +9,7 @@ DevOps operations, and documentation generation through a unified singleton inte
 """
 
 import dataclasses
-
-import firebase_admin
-
-try:
-    from pywf_internal_proprietary.api import PyWf
-except ImportError:  # pragma: no cover
-    pass
+import typing as T
 
 from ..runtime import Runtime, runtime
 from ..paths import path_enum
@@ -27,6 +21,11 @@ from .one_04_webapp import OneWebAppMixin
 from .one_05_devops import OneDevOpsMixin
 from .one_06_quick_links import OneQuickLinksMixin
 
+if T.TYPE_CHECKING:  # pragma: no cover
+    import firebase_admin
+    from pywf_internal_proprietary.api import PyWf
+
+
 @dataclasses.dataclass
 class One(
     OneBsmMixin,
@@ -40,13 +39,15 @@ class One(
     Main singleton class providing unified access to all application resources and services.
     """
     runtime: Runtime = dataclasses.field(default=runtime)
-    firebase_app: firebase_admin.App | None = dataclasses.field(default=None)
+    firebase_app: T.Optional["firebase_admin.App"] = dataclasses.field(default=None)
 
     @property
     def pywf(self) -> "PyWf":
         """
         Access Python project metadata and dependency information from pyproject.toml.
         """
+        from pywf_internal_proprietary.api import PyWf
+
         return PyWf.from_pyproject_toml(path_enum.path_pyproject_toml)
 
 
@@ -3,15 +3,44 @@
 """
 """
 
+import asyncio
 import typing as T
 from functools import cached_property
 
 import sqlalchemy as sa
 import sqlalchemy.orm as orm
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
 
 from ..database import Base
 
+#: Connection pool settings for server databases (Postgres).
+#: SQLite keeps SQLAlchemy's defaults, it has no network connect to amortize.
+POOL_KWARGS = dict(
+    pool_size=20,
+    max_overflow=40,
+    pool_pre_ping=True,
+    pool_recycle=1800,
+)
+
+#: Serverless instances (Vercel) are many, short-lived and each serves one
+#: request at a time: a pool per instance would exhaust the database's
+#: connection limit, so every session opens and closes its own connection.
+SERVERLESS_POOL_KWARGS = dict(
+    poolclass=NullPool,
+)
+
+
+def get_pool_kwargs(db_url: str, is_serverless: bool = False) -> dict[str, T.Any]:
+    """
+    Return the ``create_engine`` pool arguments for the given database URL.
+    """
+    if db_url.startswith("sqlite"):
+        return {}
+    if is_serverless:
+        return dict(SERVERLESS_POOL_KWARGS)
+    return dict(POOL_KWARGS)
+
 
 if T.TYPE_CHECKING:  # pragma: no cover
     from .one_00_main import One
@@ -24,15 +53,29 @@ class OneDbMixin:  # pragma: no cover
     def async_engine(self: "One"):
         """
         Create async engine
+
+        Postgres uses a larger pool with ``pool_pre_ping`` and ``pool_recycle``
+        so stale connections are replaced before a request handler hits them.
+        On Vercel no connections are pooled, see :data:`SERVERLESS_POOL_KWARGS`.
         """
-        return create_async_engine(self.env.async_db_url, echo=False)
+        db_url = self.env.async_db_url
+        return create_async_engine(
+            db_url,
+            echo=False,
+            **get_pool_kwargs(db_url, self.runtime.is_vercel),
+        )
 
     @cached_property
     def sync_engine(self: "One"):
         """
         Create sync engine
         """
-        return sa.create_engine(self.env.sync_db_url, echo=False)
+        db_url = self.env.sync_db_url
+        return sa.create_engine(
+            db_url,
+            echo=False,
+            **get_pool_kwargs(db_url, self.runtime.is_vercel),
+        )
 
     @cached_property
     def async_session_maker(self: "One"):
@@ -45,14 +88,37 @@ class OneDbMixin:  # pragma: no cover
     def sync_session_maker(self: "One"):
         """
         Create sync session factory
+
+        Use ``with one.sync_session_maker() as session:`` to get a fresh
+        session per unit of work.
         """
-        return orm.Session(self.sync_engine, expire_on_commit=False)
+        return orm.sessionmaker(self.sync_engine, expire_on_commit=False)
 
     async def create_db_and_tables(self):
         """Create all database tables."""
         async with self.async_engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
 
+    async def prewarm_pool(self: "One", n: int | None = None):
+        """
+        Open ``n`` connections at once and return them to the pool, so the
+        first requests after startup don't pay the connect + TLS handshake.
+
+        Defaults to ``pool_size``. No-op for SQLite and on Vercel, where
+        nothing is pooled and a cold start should not wait for connections.
+        """
+        pool_kwargs = get_pool_kwargs(self.env.async_db_url, self.runtime.is_vercel)
+        if "pool_size" not in pool_kwargs:
+            return
+        if n is None:
+            n = pool_kwargs["pool_size"]
+
+        async def checkout():
+            async with self.async_engine.connect() as conn:
+                await conn.execute(sa.text("SELECT 1"))
+
+        await asyncio.gather(*(checkout() for _ in range(n)))
+
     async def get_async_session(self) -> T.AsyncGenerator[AsyncSession, None]:
         """Dependency for getting async database session."""
         async with self.async_session_maker() as session:
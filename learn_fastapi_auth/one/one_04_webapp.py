@@ -50,13 +50,13 @@ The JSON file looks like::
 """
 
 import typing as T
-
-import firebase_admin
-from firebase_admin import credentials
+from functools import cached_property
 
 from ..logger import logger
 
 if T.TYPE_CHECKING:  # pragma: no cover
+    from firebase_admin import credentials
+
     from .one_00_main import One
 
 
@@ -77,6 +77,18 @@ class OneWebAppMixin:  # pragma: no cover
         """
         return self.firebase_app is not None
 
+    @cached_property
+    def firebase_credential(self: "One") -> "credentials.Certificate":
+        """
+        Service account credential built from ``firebase_service_account_cert``.
+
+        Parsing the RSA private key is the expensive part of
+        ``credentials.Certificate``, so it is done once per ``One`` instance.
+        """
+        from firebase_admin import credentials
+
+        return credentials.Certificate(self.firebase_service_account_cert)
+
     def init_firebase(self: "One") -> bool:
         """
         Initialize Firebase Admin SDK.
@@ -87,6 +99,8 @@ class OneWebAppMixin:  # pragma: no cover
         2. Checks if Firebase is enabled in config (returns False if disabled)
         3. Loads service account credentials from the configured path
         4. Initializes the Firebase Admin SDK
+        5. Persists Google's token signing certificates to disk, so later
+           processes skip the download (see :func:`~learn_fastapi_auth.auth.firebase.enable_cert_disk_cache`)
 
         Returns:
             True if initialization successful or already initialized.
@@ -114,13 +128,24 @@ class OneWebAppMixin:  # pragma: no cover
             logger.info("Firebase authentication is disabled.")
             return False
 
+        # Imported here: firebase_admin pulls in google-auth, which is slow to
+        # import and not needed by entry points that never touch Firebase.
+        import firebase_admin
+
         try:
-            cred = credentials.Certificate(self.firebase_service_account_cert)
+            cred = self.firebase_credential
             self.firebase_app = firebase_admin.initialize_app(cred)
             logger.info(
                 f"Firebase initialized successfully for project: {cred.project_id}"
             )
-            return True
         except Exception as e:
             logger.error(f"Failed to initialize Firebase: {e}")
             return False
+
+        try:
+            from ..auth.firebase import enable_cert_disk_cache
+
+            enable_cert_disk_cache(self.firebase_app)
+        except Exception as e:
+            logger.info(f"Firebase cert disk cache not enabled: {e}")
+        return True
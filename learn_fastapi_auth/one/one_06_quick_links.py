@@ -8,11 +8,10 @@ GitHub repositories, local file paths, and S3 storage locations, creating reStru
 tables for easy navigation and resource discovery in project documentation.
 """
 
+import io
 import typing as T
-
-from aws_console_url.api import AWSConsole
-
-from ..lazy_imports import rstobj
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
 
 from ..paths import path_enum
 from ..env import EnvNameEnum
@@ -24,27 +23,107 @@ if T.TYPE_CHECKING:  # pragma: no cover
     from .one_00_main import One
 
 
-def encode_url(url: str, title: str | None = None) -> "rstobj.URL":
-    """Create reStructuredText URL object with optional custom title."""
-    if title:
-        return rstobj.URL(title=title, link=url)
-    else:
-        return rstobj.URL(title=url, link=url)
+def encode_url(url: str, title: str | None = None) -> str:
+    """Create reStructuredText inline hyperlink with optional custom title."""
+    return f"`{title or url} <{url}>`_"
+
+
+def render_list_table(rows: list[list[str]], title: str) -> str:
+    """
+    Render a ``.. list-table::`` directive, first row as header.
+
+    Emits the same text as ``rstobj.directives.ListTable(header=True)``,
+    without building an object per cell.
+    """
+    buf = io.StringIO()
+    buf.write(f".. list-table:: {title}\n")
+    buf.write("    :header-rows: 1\n")
+    buf.write("    :stub-columns: 0\n")
+    buf.write("\n")
+    for row in rows:
+        first, *rest = row
+        buf.write(f"    * - {first}\n")
+        for item in rest:
+            buf.write(f"      - {item}\n")
+    return buf.getvalue()
+
+
+def _with_relpath(
+    rows: list[tuple[str, "Path"]],
+) -> tuple[tuple[str, "Path", "Path"], ...]:
+    return tuple(
+        (name, path, path.relative_to(path_enum.dir_project_root))
+        for name, path in rows
+    )
+
+
+#: ``(name, path, relpath)`` of project files linked on GitHub.
+_GITHUB_ROWS = _with_relpath(
+    [
+        ("GitHub Repo", path_enum.dir_project_root),
+        ("Python Library", path_enum.dir_package),
+        ("pyproject.toml", path_enum.path_pyproject_toml),
+        ("Project config.json", path_enum.path_config_json),
+        ("Project secret-config.json", path_enum.path_secret_config_json),
+        ("Unit Test Dir", path_enum.dir_unit_test),
+        ("Integration Test Dir", path_enum.dir_int_test),
+        ("Documents Dir", path_enum.dir_docs_source),
+    ]
+)
+
+#: ``(name, path, relpath)`` of project files linked on the local file system.
+_PATH_ROWS = _with_relpath(
+    [
+        ("Project Root", path_enum.dir_project_root),
+        ("Python Library", path_enum.dir_package),
+        ("pyproject.toml", path_enum.path_pyproject_toml),
+        ("dir_venv", path_enum.dir_venv),
+        ("virtualenv Python", path_enum.path_venv_bin_python),
+        ("Project config.json", path_enum.path_config_json),
+        ("Project secret-config.json", path_enum.path_secret_config_json),
+        ("Unit Test Dir", path_enum.dir_unit_test),
+        ("Integration Test Dir", path_enum.dir_int_test),
+        ("Documents Dir", path_enum.dir_docs_source),
+    ]
+)
+
+
+def write_if_changed(path: "Path", content: str):
+    """Write text to file unless it already has exactly this content."""
+    try:
+        if path.read_text(encoding="utf-8") == content:
+            return
+    except FileNotFoundError:
+        pass
+    path.write_text(content, encoding="utf-8")
 
 
 class OneQuickLinksMixin:  # pragma: no cover
     """
     Mixin providing automated quick links generation for project resources.
+
+    Rendered tables are memoized per process in :attr:`quick_links_cache`;
+    their inputs (config, ``path_enum``, AWS account) don't change at runtime.
     """
+
+    @cached_property
+    def quick_links_cache(self: "One") -> dict[str, str]:
+        """
+        Rendered quick links tables, keyed by ``"project"`` or env name.
+        """
+        return dict()
+
     def get_path_quick_link_row(
         self: "One",
         name: str,
-        path: "S3Path",
+        path: "Path",
+        relpath: T.Optional["Path"] = None,
     ) -> list:
         """
         Generate table row for local file system path quick link.
         """
-        relpath = path.relative_to(path_enum.dir_project_root)
+        if relpath is None:
+            relpath = path.relative_to(path_enum.dir_project_root)
         return [
             "🗂Local Path",
             name,
@@ -58,17 +137,22 @@ class OneQuickLinksMixin:  # pragma: no cover
         self: "One",
         name: str,
         path: "Path",
+        relpath: T.Optional["Path"] = None,
+        github_repo_url: T.Optional[str] = None,
     ) -> list:
         """
         Generate table row for GitHub repository quick link.
         """
-        relpath = path.relative_to(path_enum.dir_project_root)
+        if github_repo_url is None:
+            github_repo_url = self.pywf.github_repo_url
+        if relpath is None:
+            relpath = path.relative_to(path_enum.dir_project_root)
         p = "/".join(relpath.parts)
         main_branch = "main"
         if path.is_file():
-            url = f"{self.pywf.github_repo_url}/blob/{main_branch}/{p}"
+            url = f"{github_repo_url}/blob/{main_branch}/{p}"
         else:
-            url = f"{self.pywf.github_repo_url}/tree/{main_branch}/{p}"
+            url = f"{github_repo_url}/tree/{main_branch}/{p}"
         return [
             "🐙GitHub",
             name,
@@ -98,39 +182,27 @@ class OneQuickLinksMixin:  # pragma: no cover
         """
         Generate reStructuredText table of project-wide resource quick links.
         """
+        key = "project"
+        if key in self.quick_links_cache:
+            return self.quick_links_cache[key]
+
         env = self.config.devops
-        bsm = self.bsm_devops
-        aws_console = AWSConsole.from_bsm(bsm=bsm)
+        aws_console = self.aws_console_devops
 
         rows = list()
         columns = "Group,Resource Name,URL".split(",")
         rows.append(columns)
 
-        for name, path in [
-            ("GitHub Repo", path_enum.dir_project_root),
-            ("Python Library", path_enum.dir_python_lib),
-            ("pyproject.toml", path_enum.path_pyproject_toml),
-            ("Project config.json", path_enum.path_config_json),
-            ("Project secret-config.json", path_enum.path_secret_config_json),
-            ("Unit Test Dir", path_enum.dir_unit_test),
-            ("Integration Test Dir", path_enum.dir_int_test),
-            ("Documents Dir", path_enum.dir_docs_source),
-        ]:
-            rows.append(self.get_github_quick_link_row(name, path))
-
-        for name, path in [
-            ("Project Root", path_enum.dir_project_root),
-            ("Python Library", path_enum.dir_python_lib),
-            ("pyproject.toml", path_enum.path_pyproject_toml),
-            ("dir_venv", path_enum.dir_venv),
-            ("virtualenv Python", path_enum.path_venv_bin_python),
-            ("Project config.json", path_enum.path_config_json),
-            ("Project secret-config.json", path_enum.path_secret_config_json),
-            ("Unit Test Dir", path_enum.dir_unit_test),
-            ("Integration Test Dir", path_enum.dir_int_test),
-            ("Documents Dir", path_enum.dir_docs_source),
-        ]:
-            rows.append(self.get_path_quick_link_row(name, path))
+        github_repo_url = self.pywf.github_repo_url
+        for name, path, relpath in _GITHUB_ROWS:
+            rows.append(
+                self.get_github_quick_link_row(
+                    name, path, relpath, github_repo_url=github_repo_url
+                )
+            )
+
+        for name, path, relpath in _PATH_ROWS:
+            rows.append(self.get_path_quick_link_row(name, path, relpath))
 
         for name, s3path in [
             ("s3dir_artifacts", env.s3dir_artifacts),
@@ -150,24 +222,23 @@ class OneQuickLinksMixin:  # pragma: no cover
             ]
         )
 
-        ltable = rstobj.directives.ListTable(
-            data=rows,
-            title=f"Project",
-            header=True,
-        )
-        return ltable.render()
+        content = render_list_table(rows, title="Project")
+        self.quick_links_cache[key] = content
+        return content
 
     def generate_quick_links_for_env(self: "One", env_name: str) -> str:
         """
         Generate reStructuredText table of environment-specific resource quick links.
         """
+        if env_name in self.quick_links_cache:
+            return self.quick_links_cache[env_name]
+
         rows = list()
         columns = "Group,Resource Name,URL".split(",")
         rows.append(columns)
 
         env = self.config.get_env(env_name=env_name)
-        bsm = self.bsm_enum.get_env_bsm(env_name=env_name)
-        aws_console = AWSConsole.from_bsm(bsm=bsm)
+        aws_console = self.bsm_enum.get_env_aws_console(env_name=env_name)
 
         for name, s3path in [
             ("s3dir_data", env.s3dir_data),
@@ -183,27 +254,30 @@ class OneQuickLinksMixin:  # pragma: no cover
                 ],
             ]
         )
-        ltable = rstobj.directives.ListTable(
-            data=rows,
-            title=f"Env = {env_name}",
-            header=True,
-        )
-
-        return ltable.render()
+        content = render_list_table(rows, title=f"Env = {env_name}")
+        self.quick_links_cache[env_name] = content
+        return content
 
     def generate_quick_links(self: "One"):
         """
         Generate and write all quick links documentation files.
+
+        Files whose content is unchanged are not rewritten, so their mtime
+        stays stable and docs builds don't treat them as modified.
         """
         basename = f"project-quick-links.rst"
         path = path_enum.dir_quick_links.joinpath(basename)
         content = self.generate_quick_links_for_project()
-        path.write_text(content, encoding="utf-8")
-
-        for env in EnvNameEnum:
-            if env != EnvNameEnum.devops:
-                content = self.generate_quick_links_for_env(env_name=env.value)
-                basename = f"{env.value}-quick-links.rst"
-                path = path_enum.dir_quick_links.joinpath(basename)
-                path.write_text(content, encoding="utf-8")
-                # break
+        write_if_changed(path, content)
+
+        # Each env needs its own boto session (possibly an STS AssumeRole) and
+        # SSM console URL, all network bound and independent; overlap them.
+        env_names = [env.value for env in EnvNameEnum if env != EnvNameEnum.devops]
+        with ThreadPoolExecutor(max_workers=len(env_names) or 1) as executor:
+            contents = list(
+                executor.map(self.generate_quick_links_for_env, env_names)
+            )
+        for env_name, content in zip(env_names, contents):
+            basename = f"{env_name}-quick-links.rst"
+            path = path_enum.dir_quick_links.joinpath(basename)
+            write_if_changed(path, content)
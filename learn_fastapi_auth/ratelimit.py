@@ -17,15 +17,19 @@ Example values:
 - "100/day": 100 requests per day
 """
 
-from typing import Callable
+import functools
+import json
+import re
+import socket
+import time
 
 from fastapi import Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import Response
 from limits import parse
-from limits.storage import MemoryStorage
 from slowapi import Limiter
 from slowapi.errors import RateLimitExceeded
 from slowapi.util import get_remote_address
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 
 class PathRateLimitExceeded(Exception):
@@ -54,18 +58,94 @@ def get_client_ip(request: Request) -> str:
     forwarded_for = request.headers.get("X-Forwarded-For")
     if forwarded_for:
         # X-Forwarded-For can contain multiple IPs: "client, proxy1, proxy2"
-        # The first one is the original client IP
-        return forwarded_for.split(",")[0].strip()
+        # The first one is the original client IP (sliced, no list of hops)
+        i = forwarded_for.find(",")
+        return (forwarded_for[:i] if i >= 0 else forwarded_for).strip()
 
     # Fall back to the direct remote address
     return get_remote_address(request)
 
 
+_IPV4_MAPPED_PREFIX = b"\x00" * 10 + b"\xff\xff"
+
+
+def pack_ip(ip: str) -> bytes:
+    """
+    Pack an IP address string into its 16-byte IPv6 form.
+
+    IPv4 addresses are mapped into ``::ffff:a.b.c.d``. Values that are not
+    valid IP addresses (e.g. ``"testclient"``) fall back to their UTF-8
+    bytes, so they still get their own rate limit bucket.
+    """
+    try:
+        if "." in ip and ":" not in ip:
+            return _IPV4_MAPPED_PREFIX + socket.inet_pton(socket.AF_INET, ip)
+        return socket.inet_pton(socket.AF_INET6, ip)
+    except OSError:
+        return ip.encode("utf-8")
+
+
 # Create the limiter instance with custom key function
 limiter = Limiter(key_func=get_client_ip)
 
+
+class TokenBucketStore:
+    """
+    In-memory token buckets for path-based rate limiting.
+
+    Each key maps to a two-float list ``[tokens, last_refill]``. A limit of
+    ``amount`` per ``expiry`` seconds becomes a bucket of capacity ``amount``
+    refilled at ``amount / expiry`` tokens per second. Unlike a fixed window,
+    a client cannot burst ``2 * amount`` requests across a window boundary.
+
+    Buckets idle long enough to be full again carry no information, so they
+    are dropped by an occasional sweep inside :meth:`acquire_entry` instead
+    of a background task.
+
+    Not thread-safe; it is only touched from the event loop.
+    """
+
+    def __init__(self):
+        self._buckets: dict[bytes, list[float]] = {}
+        self._max_expiry = 0.0
+        self._last_sweep = time.monotonic()
+
+    def acquire_entry(self, key: bytes, amount: int, expiry: int) -> bool:
+        """
+        Take one token from the bucket of ``key``.
+
+        Returns True if the request is within the limit, False if exceeded.
+        """
+        now = time.monotonic()
+        if expiry > self._max_expiry:
+            self._max_expiry = expiry
+        if now - self._last_sweep > self._max_expiry:
+            self._sweep(now)
+
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            self._buckets[key] = [amount - 1.0, now]
+            return True
+        tokens = min(amount, bucket[0] + (now - bucket[1]) * amount / expiry)
+        bucket[1] = now
+        if tokens < 1.0:
+            bucket[0] = tokens
+            return False
+        bucket[0] = tokens - 1.0
+        return True
+
+    def _sweep(self, now: float):
+        # A bucket untouched for the longest expiry has fully refilled
+        cutoff = now - self._max_expiry
+        self._buckets = {k: b for k, b in self._buckets.items() if b[1] > cutoff}
+        self._last_sweep = now
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
 # Storage for path-based rate limiting (used for fastapi-users routes)
-_path_storage = MemoryStorage()
+_path_storage = TokenBucketStore()
 
 
 def reset_rate_limit_storage():
@@ -76,7 +156,18 @@ def reset_rate_limit_storage():
     for testing purposes to ensure tests don't affect each other.
     """
     global _path_storage
-    _path_storage = MemoryStorage()
+    _path_storage = TokenBucketStore()
+
+
+@functools.cache
+def _parse_limit(limit_string: str) -> tuple[int, int]:
+    """
+    Parse a limit string like "5/minute" into ``(amount, expiry_seconds)``.
+
+    Cached, so each distinct limit string is tokenized once per process.
+    """
+    rate_limit = parse(limit_string)
+    return rate_limit.amount, rate_limit.get_expiry()
 
 
 def check_path_rate_limit(
@@ -102,24 +193,39 @@ def check_path_rate_limit(
         PathRateLimitExceeded: When rate limit is exceeded
     """
     client_ip = get_client_ip(request)
-    # Create a unique key combining client IP and path
-    key = f"{path_identifier}:{client_ip}"
+    # Create a unique key combining path and packed client IP
+    key = path_identifier.encode("utf-8") + b"\x00" + pack_ip(client_ip)
 
-    # Parse the limit string
-    rate_limit = parse(limit_string)
+    amount, expiry = _parse_limit(limit_string)
 
     # Try to acquire an entry - returns True if within limit, False if exceeded
     # acquire_entry(key, limit_amount, expiry_seconds)
-    if not _path_storage.acquire_entry(key, rate_limit.amount, rate_limit.get_expiry()):
+    if not _path_storage.acquire_entry(key, amount, expiry):
         raise PathRateLimitExceeded(limit_string)
 
     return True
 
 
+@functools.lru_cache(maxsize=128)
+def _rate_limit_body(message: str) -> bytes:
+    """
+    Encode the 429 JSON body for ``message`` once and reuse the bytes.
+
+    Messages only vary by the configured limit, so under a flood of
+    rejected requests every response reuses an already encoded body.
+    The bytes match what ``JSONResponse`` would render.
+    """
+    return json.dumps(
+        {"detail": "RATE_LIMIT_EXCEEDED", "message": message},
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
 async def rate_limit_exceeded_handler(
     request: Request,
     exc: RateLimitExceeded,
-) -> JSONResponse:
+) -> Response:
     """
     Custom handler for rate limit exceeded errors from slowapi decorator.
 
@@ -133,17 +239,15 @@ async def rate_limit_exceeded_handler(
         exc: RateLimitExceeded exception with rate limit details
 
     Returns:
-        JSONResponse with 429 status and error details
+        JSON response with 429 status and error details
     """
     # For slowapi RateLimitExceeded, the detail is available via the limit object
     detail = str(exc.detail) if hasattr(exc, "detail") else "Rate limit exceeded"
 
-    response = JSONResponse(
+    response = Response(
+        content=_rate_limit_body(f"Too many requests. {detail}"),
         status_code=429,
-        content={
-            "detail": "RATE_LIMIT_EXCEEDED",
-            "message": f"Too many requests. {detail}",
-        },
+        media_type="application/json",
     )
 
     # Add Retry-After header if available
@@ -157,7 +261,7 @@ async def rate_limit_exceeded_handler(
 async def path_rate_limit_exceeded_handler(
     request: Request,
     exc: PathRateLimitExceeded,
-) -> JSONResponse:
+) -> Response:
     """
     Custom handler for path-based rate limit exceeded errors.
 
@@ -166,51 +270,87 @@ async def path_rate_limit_exceeded_handler(
         exc: PathRateLimitExceeded exception with limit details
 
     Returns:
-        JSONResponse with 429 status and error details
+        JSON response with 429 status and error details
     """
-    response = JSONResponse(
+    return Response(
+        content=_rate_limit_body(f"Too many requests. Limit: {exc.limit_string}"),
         status_code=429,
-        content={
-            "detail": "RATE_LIMIT_EXCEEDED",
-            "message": f"Too many requests. Limit: {exc.limit_string}",
-        },
+        media_type="application/json",
     )
-    return response
 
 
-def create_path_rate_limit_middleware(
-    path_limits: dict[str, str],
-) -> Callable:
+def _first_segment(path: str) -> str:
+    """
+    Return the first segment of a path, e.g. ``"/api"`` for ``"/api/auth"``.
+    """
+    i = path.find("/", 1)
+    return path if i < 0 else path[:i]
+
+
+class PathRateLimitMiddleware:
     """
-    Create middleware for path-based rate limiting.
+    Pure ASGI middleware for path-based rate limiting.
 
-    This middleware checks requests against configured rate limits
-    for specific paths, particularly useful for fastapi-users routes.
+    Checks requests against configured rate limits for specific path
+    prefixes, particularly useful for fastapi-users routes. Requests to
+    other paths are passed straight through without building a ``Request``.
 
     Args:
+        app: The ASGI application to wrap
         path_limits: Dictionary mapping path prefixes to rate limit strings
                     Example: {"/api/auth/login": "5/minute"}
 
-    Returns:
-        Middleware callable
-    """
+    Usage::
 
-    async def middleware(request: Request, call_next):
-        """Apply rate limiting based on request path."""
-        path = request.url.path
+        app.add_middleware(PathRateLimitMiddleware, path_limits=path_limits)
+    """
 
-        # Check if this path matches any rate limit rules
-        for path_prefix, limit_string in path_limits.items():
-            if path.startswith(path_prefix):
+    def __init__(self, app: ASGIApp, path_limits: dict[str, str]):
+        self.app = app
+        self.path_limits = dict(path_limits)
+        # One anchored alternation over all prefixes, longest first: ``re``
+        # tries alternatives in order, so the most specific rule wins and
+        # the lookup is a single C-level match instead of a Python loop.
+        prefixes = sorted(self.path_limits, key=len, reverse=True)
+        self.pattern: re.Pattern | None = (
+            re.compile("|".join(re.escape(p) for p in prefixes)) if prefixes else None
+        )
+        # First path segments ("/api") of all rules. A path whose first
+        # segment is not in here cannot match, which rejects static files,
+        # health checks, etc. with one set lookup. Only usable when every
+        # prefix spans a whole first segment ("/lim" also matches "/limit").
+        self.first_segments: frozenset[str] | None = (
+            frozenset(_first_segment(p) for p in prefixes)
+            if all(p.find("/", 1) > 0 for p in prefixes)
+            else None
+        )
+        # Parse every limit up front so no request pays the parse cost
+        for limit_string in self.path_limits.values():
+            _parse_limit(limit_string)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and self.pattern is not None:
+            path = scope["path"]
+            if (
+                self.first_segments is not None
+                and _first_segment(path) not in self.first_segments
+            ):
+                await self.app(scope, receive, send)
+                return
+            match = self.pattern.match(path)
+            if match is not None:
+                path_prefix = match.group()
+                request = Request(scope)
                 try:
-                    check_path_rate_limit(request, limit_string, path_prefix)
+                    check_path_rate_limit(
+                        request, self.path_limits[path_prefix], path_prefix
+                    )
                 except PathRateLimitExceeded as exc:
-                    return await path_rate_limit_exceeded_handler(request, exc)
-                break
-
-        return await call_next(request)
+                    response = await path_rate_limit_exceeded_handler(request, exc)
+                    await response(scope, receive, send)
+                    return
 
-    return middleware
+        await self.app(scope, receive, send)
 
 
 def setup_rate_limiting(app):
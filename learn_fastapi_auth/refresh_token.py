@@ -4,7 +4,7 @@
 Refresh Token Module.
 
 Provides functionality for token refresh mechanism:
-- Generate secure refresh tokens
+- Generate secure refresh tokens (one at a time or in batches)
 - Store and validate refresh tokens in database
 - Revoke refresh tokens (logout)
 - Delete all refresh tokens for a user (logout from all devices)
@@ -13,29 +13,56 @@ The refresh token mechanism allows users to obtain new access tokens
 without re-authenticating, improving user experience while maintaining security.
 """
 
-import secrets
+import base64
+import functools
+import os
+import time
 import uuid
-from datetime import datetime, timedelta, timezone
 from typing import Optional
 
-from sqlalchemy import delete, select
+from sqlalchemy import bindparam, delete, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload
 
 from .one.api import one
-from .models import RefreshToken
+from .models import RefreshToken, User, hash_token
+from .token_cache import TokenCache
+
+
+# Refresh tokens recently found valid in the database, value is the user id
+valid_refresh_tokens = TokenCache()
 
 
 def generate_refresh_token() -> str:
     """
     Generate a secure random refresh token.
 
-    Uses secrets.token_urlsafe() which generates cryptographically secure
-    random tokens suitable for security-sensitive applications.
+    Same output as ``secrets.token_urlsafe(48)``: 48 bytes from the OS
+    CSPRNG, URL-safe base64 encoded. 48 is a multiple of 3, so there is no
+    ``=`` padding to strip and the encoding is done in a single call.
 
     Returns:
         A 64-character URL-safe random string.
     """
-    return secrets.token_urlsafe(48)
+    return base64.urlsafe_b64encode(os.urandom(48)).decode("ascii")
+
+
+def generate_refresh_tokens(n: int) -> list[str]:
+    """
+    Generate ``n`` refresh tokens from a single ``os.urandom`` read.
+
+    Each 48-byte slice encodes to exactly 64 characters with no padding, so
+    the whole buffer is encoded once and cut into 64-character tokens. Each
+    token is identical in form to :func:`generate_refresh_token`.
+
+    Args:
+        n: Number of tokens to generate
+
+    Returns:
+        A list of ``n`` 64-character URL-safe random strings.
+    """
+    encoded = base64.urlsafe_b64encode(os.urandom(48 * n)).decode("ascii")
+    return [encoded[i : i + 64] for i in range(0, 64 * n, 64)]
 
 
 async def create_refresh_token(
@@ -57,12 +84,10 @@ async def create_refresh_token(
     """
     token_str = generate_refresh_token()
     actual_lifetime = lifetime_seconds if lifetime_seconds is not None else one.env.refresh_token_lifetime
-    expires_at = datetime.now(timezone.utc) + timedelta(
-        seconds=actual_lifetime
-    )
+    expires_at = int(time.time()) + actual_lifetime
 
     refresh_token = RefreshToken(
-        token=token_str,
+        token_hash=hash_token(token_str),
         user_id=user_id,
         expires_at=expires_at,
     )
@@ -72,6 +97,26 @@ async def create_refresh_token(
     return token_str
 
 
+# Hot-path SELECTs built once at import; callers only bind the parameters.
+_SELECT_TOKEN_OWNER = select(RefreshToken.user_id, RefreshToken.expires_at).where(
+    RefreshToken.token_hash == bindparam("token_hash")
+)
+_SELECT_ACTIVE_USER = (
+    select(User)
+    .where(User.id == bindparam("user_id"), User.is_active.is_(True))
+    .options(raiseload("*"))
+)
+_SELECT_TOKEN_USER = (
+    select(User, RefreshToken.expires_at)
+    .join(RefreshToken, RefreshToken.user_id == User.id)
+    .where(
+        RefreshToken.token_hash == bindparam("token_hash"),
+        User.is_active.is_(True),
+    )
+    .options(raiseload("*"))
+)
+
+
 async def validate_refresh_token(
     session: AsyncSession,
     token_str: str,
@@ -83,6 +128,14 @@ async def validate_refresh_token(
     1. Token exists in database
     2. Token has not expired
 
+    Only ``user_id`` and ``expires_at`` are selected, no ORM object is built.
+    Expired tokens are not deleted here; :func:`cleanup_expired_tokens`
+    removes them in bulk.
+
+    Valid tokens are cached in :data:`valid_refresh_tokens`, so repeated
+    refreshes with the same cookie skip the database for up to
+    ``valid_refresh_tokens.ttl`` seconds.
+
     Args:
         session: Database session
         token_str: The refresh token to validate
@@ -90,27 +143,66 @@ async def validate_refresh_token(
     Returns:
         User UUID if token is valid, None otherwise
     """
-    result = await session.execute(
-        select(RefreshToken).where(RefreshToken.token == token_str)
-    )
-    refresh_token = result.scalar_one_or_none()
+    token_hash = hash_token(token_str)
+    user_id = valid_refresh_tokens.get(token_hash)
+    if user_id is not None:
+        return user_id
+
+    result = await session.execute(_SELECT_TOKEN_OWNER, {"token_hash": token_hash})
+    row = result.one_or_none()
+
+    if row is None:
+        return None
+    user_id, expires_at = row
 
-    if refresh_token is None:
+    remaining = expires_at - int(time.time())
+    if remaining <= 0:
+        # Expired rows are removed in bulk by cleanup_expired_tokens()
         return None
 
-    # Handle both timezone-aware and naive datetimes (SQLite stores naive)
-    now = datetime.now(timezone.utc)
-    expires_at = refresh_token.expires_at
-    if expires_at.tzinfo is None:
-        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    valid_refresh_tokens.put(token_hash, user_id, remaining)
+    return user_id
 
-    if expires_at <= now:
-        # Token has expired, delete it
-        await session.delete(refresh_token)
-        await session.commit()
+
+async def validate_and_load_user(
+    session: AsyncSession,
+    token_str: str,
+) -> Optional[User]:
+    """
+    Validate a refresh token and load its active user in one query.
+
+    Same checks as :func:`validate_refresh_token`, but the token row is
+    joined to ``user`` so the refresh endpoint needs a single round-trip.
+    On a :data:`valid_refresh_tokens` hit only the user is selected.
+
+    Relationships of the returned user are not loaded (``raiseload``).
+
+    Args:
+        session: Database session
+        token_str: The refresh token to validate
+
+    Returns:
+        The active User if the token is valid, None otherwise
+    """
+    token_hash = hash_token(token_str)
+    user_id = valid_refresh_tokens.get(token_hash)
+    if user_id is not None:
+        result = await session.execute(_SELECT_ACTIVE_USER, {"user_id": user_id})
+        return result.scalar_one_or_none()
+
+    result = await session.execute(_SELECT_TOKEN_USER, {"token_hash": token_hash})
+    row = result.one_or_none()
+
+    if row is None:
         return None
+    user, expires_at = row
 
-    return refresh_token.user_id
+    remaining = expires_at - int(time.time())
+    if remaining <= 0:
+        return None
+
+    valid_refresh_tokens.put(token_hash, user.id, remaining)
+    return user
 
 
 async def revoke_refresh_token(
@@ -129,17 +221,17 @@ async def revoke_refresh_token(
     Returns:
         True if token was found and deleted, False otherwise
     """
+    token_hash = hash_token(token_str)
     result = await session.execute(
-        select(RefreshToken).where(RefreshToken.token == token_str)
+        delete(RefreshToken)
+        .where(RefreshToken.token_hash == token_hash)
+        .execution_options(synchronize_session=False)
     )
-    refresh_token = result.scalar_one_or_none()
-
-    if refresh_token:
-        await session.delete(refresh_token)
-        await session.commit()
-        return True
-
-    return False
+    await session.commit()
+    # Dropped only once the DELETE is committed: a concurrent lookup
+    # could otherwise still read the row and cache the token again
+    valid_refresh_tokens.discard_token(token_hash)
+    return result.rowcount > 0
 
 
 async def revoke_all_user_refresh_tokens(
@@ -152,6 +244,10 @@ async def revoke_all_user_refresh_tokens(
     Used when user wants to logout from all devices or
     when a security event requires invalidating all sessions.
 
+    The cache is only cleared in this process: other worker processes may
+    keep accepting the revoked tokens from their ``valid_refresh_tokens``
+    cache for up to ``valid_refresh_tokens.ttl`` seconds (5 by default).
+
     Args:
         session: Database session
         user_id: UUID of the user
@@ -160,33 +256,55 @@ async def revoke_all_user_refresh_tokens(
         Number of tokens revoked
     """
     result = await session.execute(
-        delete(RefreshToken).where(RefreshToken.user_id == user_id)
+        delete(RefreshToken)
+        .where(RefreshToken.user_id == user_id)
+        .execution_options(synchronize_session=False)
     )
     await session.commit()
+    # After the commit, see revoke_refresh_token
+    valid_refresh_tokens.discard_user(user_id)
     return result.rowcount
 
 
 async def cleanup_expired_tokens(
     session: AsyncSession,
+    batch_size: int = 10000,
 ) -> int:
     """
     Delete all expired refresh tokens from the database.
 
-    Can be called periodically (e.g., via cron job) to clean up
+    Called at startup and periodically from the app lifespan to clean up
     expired tokens and reduce database size.
 
+    Rows are deleted in batches of ``batch_size``, each in its own short
+    transaction, so a large backlog never holds a long lock that would
+    block concurrent token lookups.
+
     Args:
         session: Database session
+        batch_size: Maximum number of rows deleted per transaction
 
     Returns:
         Number of tokens deleted
     """
-    now = datetime.now(timezone.utc)
-    result = await session.execute(
-        delete(RefreshToken).where(RefreshToken.expires_at <= now)
-    )
-    await session.commit()
-    return result.rowcount
+    now = int(time.time())
+    total = 0
+    while True:
+        result = await session.execute(
+            delete(RefreshToken)
+            .where(
+                RefreshToken.token_hash.in_(
+                    select(RefreshToken.token_hash)
+                    .where(RefreshToken.expires_at <= now)
+                    .limit(batch_size)
+                )
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+        total += result.rowcount
+        if result.rowcount < batch_size:
+            return total
 
 
 def get_refresh_token_cookie_settings(lifetime_seconds: Optional[int] = None) -> dict:
@@ -201,9 +319,18 @@ def get_refresh_token_cookie_settings(lifetime_seconds: Optional[int] = None) ->
             config.refresh_token_lifetime (7 days by default).
 
     Returns:
-        Dictionary with cookie configuration
+        Dictionary with cookie configuration. The same dict is returned for
+        the same lifetime, callers must not mutate it (``**`` it instead).
     """
     actual_lifetime = lifetime_seconds if lifetime_seconds is not None else one.env.refresh_token_lifetime
+    return _build_cookie_settings(actual_lifetime)
+
+
+@functools.lru_cache(maxsize=8)
+def _build_cookie_settings(actual_lifetime: int) -> dict:
+    """
+    Build the cookie settings once per distinct lifetime.
+    """
     return {
         "key": one.env.refresh_token_cookie_name,
         "httponly": True,  # JavaScript cannot access this cookie
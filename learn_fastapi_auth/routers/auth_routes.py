@@ -8,13 +8,15 @@ Provides all authentication-related endpoints:
 - Custom routes (logout, refresh, change-password, firebase)
 """
 
+import functools
 import secrets
 
 from fastapi import APIRouter, Depends, HTTPException, Request
-from fastapi.responses import JSONResponse
-from fastapi_users.password import PasswordHelper
-from sqlalchemy import select
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response
+from sqlalchemy import bindparam, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload
 
 from ..auth.firebase import (
     FirebaseNotInitializedError,
@@ -28,7 +30,9 @@ from ..auth.users import (
     fastapi_users,
     get_jwt_strategy,
     get_user_manager,
+    password_helper,
 )
+from ..logger import logger
 from ..models import User, UserData
 from ..one.api import one
 from ..ratelimit import limiter
@@ -37,7 +41,7 @@ from ..refresh_token import (
     get_refresh_token_cookie_settings,
     revoke_all_user_refresh_tokens,
     revoke_refresh_token,
-    validate_refresh_token,
+    validate_and_load_user,
 )
 from ..schemas import (
     ChangePasswordRequest,
@@ -50,9 +54,39 @@ from ..schemas import (
     UserRead,
     UserUpdate,
 )
+from ..utils import uuid7
 
 router = APIRouter()
 
+# Constant response body for ``/logout``, encoded once at import time with the
+# same compact separators Starlette's ``JSONResponse`` uses.
+_LOGOUT_BODY = b'{"message":"Successfully logged out"}'
+
+# User lookup of ``/firebase-login``, built once at import.
+_SELECT_FIREBASE_USER = (
+    select(User)
+    .where(
+        or_(
+            User.firebase_uid == bindparam("firebase_uid"),
+            User.email == bindparam("email"),
+        )
+    )
+    .options(raiseload("*"))
+    .limit(2)
+)
+
+
+@functools.cache
+def _oauth_placeholder_hash() -> str:
+    """
+    Password hash given to users created through Firebase OAuth.
+
+    Hash of a random password that is discarded right away, so it can never
+    be matched. Computed once per process instead of once per signup; the
+    user replaces it via ``/api/auth/set-password``.
+    """
+    return password_helper.hash(secrets.token_urlsafe(32))
+
 
 # =============================================================================
 # fastapi-users Routes
@@ -119,9 +153,10 @@ async def logout(
         await revoke_refresh_token(session, refresh_token)
 
     # Create response that clears the refresh token cookie
-    response = JSONResponse(
-        content={"message": "Successfully logged out"},
+    response = Response(
+        content=_LOGOUT_BODY,
         status_code=200,
+        media_type="application/json",
     )
     response.delete_cookie(
         key=one.env.refresh_token_cookie_name,
@@ -155,30 +190,24 @@ async def refresh_access_token(
             detail="REFRESH_TOKEN_MISSING",
         )
 
-    # Validate refresh token and get user_id
-    user_id = await validate_refresh_token(session, refresh_token)
+    # Validate refresh token and load its active user in one query
+    user = await validate_and_load_user(session, refresh_token)
 
-    if user_id is None:
+    if user is None:
         raise HTTPException(
             status_code=401,
             detail="REFRESH_TOKEN_INVALID",
         )
 
-    # Get user from database
-    result = await session.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
-
-    if user is None or not user.is_active:
-        raise HTTPException(
-            status_code=401,
-            detail="USER_INACTIVE",
-        )
-
     # Generate new access token
     jwt_strategy = get_jwt_strategy()
     access_token = await jwt_strategy.write_token(user)
 
-    return TokenRefreshResponse(access_token=access_token)
+    # Return the body directly so FastAPI skips re-validating it against
+    # ``TokenRefreshResponse`` (the model still documents the schema).
+    return JSONResponse(
+        content={"access_token": access_token, "token_type": "bearer"},
+    )
 
 
 @router.post(
@@ -225,15 +254,21 @@ async def change_password(
     data: ChangePasswordRequest,
     user: User = Depends(current_active_user),
     user_manager=Depends(get_user_manager),
+    session: AsyncSession = Depends(one.get_async_session),
 ):
     """
     Change password for logged-in user.
 
     Requires current password verification before updating to new password.
+    The new hash and the revocation of every refresh token of the user are
+    committed in one transaction, so other devices must log in again.
     """
-    # Verify current password
-    verified, _ = user_manager.password_helper.verify_and_update(
-        data.current_password, user.hashed_password
+    # Verify current password. Hashing is CPU-bound (argon2/bcrypt release
+    # the GIL), so it runs in the thread pool instead of blocking the loop.
+    verified, _ = await run_in_threadpool(
+        user_manager.password_helper.verify_and_update,
+        data.current_password,
+        user.hashed_password,
     )
     if not verified:
         raise HTTPException(
@@ -242,12 +277,15 @@ async def change_password(
         )
 
     # Update to new password
-    hashed_password = user_manager.password_helper.hash(data.new_password)
-    user.hashed_password = hashed_password
+    hashed_password = await run_in_threadpool(
+        user_manager.password_helper.hash, data.new_password
+    )
+    await session.execute(
+        update(User).where(User.id == user.id).values(hashed_password=hashed_password)
+    )
 
-    session = user_manager.user_db.session
-    session.add(user)
-    await session.commit()
+    # Revoke all refresh tokens, this also commits the UPDATE above
+    await revoke_all_user_refresh_tokens(session, user.id)
 
     return MessageResponse(message="Password changed successfully")
 
@@ -278,7 +316,9 @@ async def set_password(
         )
 
     # Set the new password
-    hashed_password = user_manager.password_helper.hash(data.new_password)
+    hashed_password = await run_in_threadpool(
+        user_manager.password_helper.hash, data.new_password
+    )
     user.hashed_password = hashed_password
     user.has_set_password = True
 
@@ -349,33 +389,31 @@ async def firebase_login(
 
     is_new_user = False
 
-    # Try to find existing user by firebase_uid
+    # Find existing user by firebase_uid or by email (user may have
+    # registered with password first) in one query. Both columns are
+    # unique, so at most two rows come back; the firebase_uid match wins.
     result = await session.execute(
-        select(User).where(User.firebase_uid == firebase_uid)
+        _SELECT_FIREBASE_USER, {"firebase_uid": firebase_uid, "email": email}
     )
-    user = result.scalar_one_or_none()
+    users = result.scalars().all()
+    user = next((u for u in users if u.firebase_uid == firebase_uid), None)
 
     if user is None:
-        # Try to find by email (user may have registered with password first)
-        result = await session.execute(select(User).where(User.email == email))
-        user = result.scalar_one_or_none()
+        user = next((u for u in users if u.email == email), None)
 
         if user is not None:
             # Link Firebase UID to existing user
+            # (committed together with the refresh token below)
             user.firebase_uid = firebase_uid
-            session.add(user)
-            await session.commit()
-            print(f"Linked Firebase UID {firebase_uid} to existing user {user.id}")
+            logger.info(
+                f"Linked Firebase UID {firebase_uid} to existing user {user.id}"
+            )
         else:
-            # Create new user
-            # Generate a random password (user won't use it, they'll use OAuth)
-            random_password = secrets.token_urlsafe(32)
-
-            # Hash the password
-            password_helper = PasswordHelper()
-            hashed_password = password_helper.hash(random_password)
+            # Create new user with an unusable password (they'll use OAuth)
+            hashed_password = await run_in_threadpool(_oauth_placeholder_hash)
 
             user = User(
+                id=uuid7(),  # set here so no flush is needed for the JWT
                 email=email,
                 hashed_password=hashed_password,
                 is_active=True,
@@ -384,23 +422,22 @@ async def firebase_login(
                 firebase_uid=firebase_uid,
                 has_set_password=False,  # OAuth user hasn't set their own password
             )
-            session.add(user)
-            await session.commit()
-            await session.refresh(user)
-
             # Create UserData for the new user
-            user_data = UserData(user_id=user.id, text_value="")
-            session.add(user_data)
-            await session.commit()
+            user.user_data = UserData(text_value="")
+            # The user, its UserData and the refresh token below are
+            # inserted and committed together in one transaction
+            session.add(user)
 
             is_new_user = True
-            print(f"Created new user {user.id} via Firebase ({user_info.provider})")
+            logger.info(
+                f"Created new user {user.id} via Firebase ({user_info.provider})"
+            )
 
     # Generate our own JWT access token
     jwt_strategy = get_jwt_strategy()
     access_token = await jwt_strategy.write_token(user)
 
-    # Create refresh token
+    # Create refresh token (its commit also persists any user changes above)
     refresh_token_str = await create_refresh_token(
         session, user.id, one.env.refresh_token_lifetime
     )
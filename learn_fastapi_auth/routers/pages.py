@@ -7,8 +7,11 @@ Handles email link redirects for verification and password reset.
 These routes redirect users to the frontend with appropriate tokens.
 """
 
+import functools
+from urllib.parse import quote
+
 from fastapi import APIRouter, Query, status
-from fastapi.responses import RedirectResponse
+from fastapi.responses import Response
 
 from ..one.api import one
 
@@ -18,6 +21,23 @@ router = APIRouter(
 )
 
 
+@functools.cache
+def _get_redirect_prefixes() -> tuple[str, str]:
+    """
+    Build the frontend redirect URL prefixes once per process.
+
+    Returns ``(verify_email_prefix, reset_password_prefix)``; the token is
+    appended per request. Responses are plain ``Response`` objects with a
+    ``location`` header, skipping ``RedirectResponse``'s parsing of the
+    whole URL; only the token is percent-encoded.
+    """
+    frontend_url = one.env.final_frontend_url
+    return (
+        f"{frontend_url}/signin?verified=pending&token=",
+        f"{frontend_url}/reset-password?token=",
+    )
+
+
 @router.get("/verify-email")
 async def verify_email_page(
     token: str = Query(..., description="Verification token"),
@@ -28,9 +48,9 @@ async def verify_email_page(
     This route is accessed when a user clicks the verification link in their email.
     It redirects to the frontend page that will call the API to verify the token.
     """
-    return RedirectResponse(
-        url=f"{one.env.final_frontend_url}/signin?verified=pending&token={token}",
+    return Response(
         status_code=status.HTTP_302_FOUND,
+        headers={"location": _get_redirect_prefixes()[0] + quote(token, safe="")},
     )
 
 
@@ -44,7 +64,7 @@ async def reset_password_redirect(
     This route is accessed when a user clicks the reset link in their email.
     It redirects to the reset password page with the token.
     """
-    return RedirectResponse(
-        url=f"{one.env.final_frontend_url}/reset-password?token={token}",
+    return Response(
         status_code=status.HTTP_302_FOUND,
+        headers={"location": _get_redirect_prefixes()[1] + quote(token, safe="")},
     )
@@ -7,8 +7,9 @@ Provides CRUD endpoints for user-specific data.
 All endpoints require verified user authentication.
 """
 
-from fastapi import APIRouter, Depends, Request
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..auth.users import current_verified_user
@@ -20,6 +21,32 @@ from ..schemas import UserDataRead, UserDataUpdate
 router = APIRouter(prefix="/api/user-data", tags=["user-data"])
 
 
+def _insert(session: AsyncSession):
+    """
+    Return the dialect specific ``insert`` supporting ``ON CONFLICT``.
+
+    Both SQLite (local) and PostgreSQL (remote) support
+    ``INSERT ... ON CONFLICT ... RETURNING``.
+    """
+    if session.bind.dialect.name == "sqlite":
+        return sqlite.insert
+    return postgresql.insert
+
+
+def _user_data_response(user_data: UserData) -> Response:
+    """
+    Serialize ``user_data`` with pydantic-core's native JSON encoder.
+
+    Skips FastAPI's ``response_model`` round trip (validate, then
+    ``jsonable_encoder``, then ``json.dumps``). ``response_model`` is kept
+    on the routes for the OpenAPI schema.
+    """
+    return Response(
+        content=UserDataRead.model_validate(user_data).model_dump_json(),
+        media_type="application/json",
+    )
+
+
 @router.get(
     "",
     response_model=UserDataRead,
@@ -31,17 +58,27 @@ async def get_user_data(
     session: AsyncSession = Depends(one.get_async_session),
 ):
     """Get current user's data."""
-    result = await session.execute(select(UserData).where(UserData.user_id == user.id))
-    user_data = result.scalar_one_or_none()
+    # ``user_id`` is the primary key: one indexed SELECT by PK (the user
+    # dependency loads ``User`` with ``raiseload("*")``, so ``user_data`` is
+    # not already in the identity map).
+    user_data = await session.get(UserData, user.id)
 
     if not user_data:
-        # Create user_data if it doesn't exist
-        user_data = UserData(user_id=user.id, text_value="")
-        session.add(user_data)
+        # Create user_data if it doesn't exist, the row comes back through
+        # RETURNING so no refresh is needed. ON CONFLICT DO NOTHING makes a
+        # concurrent create harmless; re-select in that rare case.
+        stmt = (
+            _insert(session)(UserData)
+            .values(user_id=user.id, text_value="")
+            .on_conflict_do_nothing(index_elements=[UserData.user_id])
+            .returning(UserData)
+        )
+        user_data = (await session.execute(stmt)).scalar_one_or_none()
         await session.commit()
-        await session.refresh(user_data)
+        if user_data is None:
+            user_data = await session.get_one(UserData, user.id)
 
-    return user_data
+    return _user_data_response(user_data)
 
 
 @router.put(
@@ -56,17 +93,19 @@ async def update_user_data(
     session: AsyncSession = Depends(one.get_async_session),
 ):
     """Update current user's data."""
-    result = await session.execute(select(UserData).where(UserData.user_id == user.id))
-    user_data = result.scalar_one_or_none()
-
-    if not user_data:
-        # Create user_data if it doesn't exist
-        user_data = UserData(user_id=user.id, text_value=data.text_value)
-        session.add(user_data)
-    else:
-        user_data.text_value = data.text_value
-
+    # Single upsert: creates user_data if it doesn't exist, otherwise updates
+    # it, and returns the resulting row.
+    stmt = (
+        _insert(session)(UserData)
+        .values(user_id=user.id, text_value=data.text_value)
+        .on_conflict_do_update(
+            index_elements=[UserData.user_id],
+            set_={"text_value": data.text_value, "updated_at": func.now()},
+        )
+        .returning(UserData)
+        .execution_options(populate_existing=True)
+    )
+    user_data = (await session.execute(stmt)).scalar_one()
     await session.commit()
-    await session.refresh(user_data)
 
-    return user_data
+    return _user_data_response(user_data)
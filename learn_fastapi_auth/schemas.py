@@ -13,7 +13,7 @@ from typing import Optional
 import uuid
 
 from fastapi_users import schemas
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, computed_field
 
 
 # =============================================================================
@@ -24,28 +24,17 @@ class UserRead(schemas.BaseUser[uuid.UUID]):
 
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
-    is_oauth_user: bool = False
-
-    @classmethod
-    def model_validate(cls, obj, **kwargs):
-        """Override to compute is_oauth_user from has_set_password."""
-        # Check if obj has has_set_password attribute (from ORM model)
-        if hasattr(obj, "has_set_password"):
-            # Create a dict copy and add is_oauth_user
-            # is_oauth_user = True means user has NOT set their own password
-            # (they only use OAuth login), so they cannot change password
-            data = {
-                "id": obj.id,
-                "email": obj.email,
-                "is_active": obj.is_active,
-                "is_superuser": obj.is_superuser,
-                "is_verified": obj.is_verified,
-                "created_at": getattr(obj, "created_at", None),
-                "updated_at": getattr(obj, "updated_at", None),
-                "is_oauth_user": not obj.has_set_password,
-            }
-            return super().model_validate(data, **kwargs)
-        return super().model_validate(obj, **kwargs)
+    # Read from the ORM object via from_attributes, never serialized
+    has_set_password: bool = Field(default=True, exclude=True)
+
+    @computed_field
+    @property
+    def is_oauth_user(self) -> bool:
+        """
+        True if the user has NOT set their own password (they only use OAuth
+        login), so they cannot change password.
+        """
+        return not self.has_set_password
 
 
 class UserCreate(schemas.BaseUserCreate):
@@ -1,19 +1,146 @@
 # -*- coding: utf-8 -*-
 
+import asyncio
+import itertools
+import os
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
 import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
+from pwdlib.hashers.bcrypt import BcryptHasher
+from pytest_asyncio import is_async_test
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import StaticPool
 
 from learn_fastapi_auth.database import Base
 from learn_fastapi_auth.one.api import one
 
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
+TEST_PASSWORD = "TestPass123!"
 
+#: Production algorithms at their minimum cost (argon2id t=1, m=8 KiB;
+#: bcrypt 4 rounds), so tests keep real hashes without the KDF's CPU time.
+CHEAP_PASSWORD_HASH = PasswordHash(
+    (
+        Argon2Hasher(time_cost=1, memory_cost=8, parallelism=1),
+        BcryptHasher(rounds=4),
+    )
+)
 
-@pytest_asyncio.fixture
+
+def pytest_collection_modifyitems(items):
+    """
+    Run every async test in the session event loop.
+
+    The engine below is created once per session and its connection is bound
+    to that loop, so tests must share it. Async fixtures use the same loop
+    through ``asyncio_default_fixture_loop_scope`` in ``pyproject.toml``.
+    """
+    session_loop = pytest.mark.asyncio(loop_scope="session")
+    for item in items:
+        if is_async_test(item):
+            item.add_marker(session_loop, append=False)
+
+
+@pytest.fixture(autouse=True)
+def fast_password_hashing(request, monkeypatch):
+    """
+    Hash passwords with :data:`CHEAP_PASSWORD_HASH` in every test not marked
+    ``slow``; tests that check the real hash parameters are marked ``slow``.
+
+    With ``FAST_TESTS=1`` the KDF is replaced by a plain comparison instead.
+    Pair with ``-m "not slow"`` for the quickest lane.
+    """
+    if request.node.get_closest_marker("slow"):
+        return
+    from learn_fastapi_auth.auth.users import password_helper
+
+    if not os.environ.get("FAST_TESTS"):
+        monkeypatch.setattr(password_helper, "password_hash", CHEAP_PASSWORD_HASH)
+        return
+
+    from fastapi_users.password import PasswordHelper
+
+    monkeypatch.setattr(PasswordHelper, "hash", lambda self, password: password)
+    monkeypatch.setattr(
+        PasswordHelper,
+        "verify_and_update",
+        lambda self, plain, hashed: (plain == hashed, None),
+    )
+
+
+@pytest.fixture(autouse=True)
+def email_hooks(monkeypatch) -> SimpleNamespace:
+    """
+    Replace the ``UserManager`` hooks that send email with ``AsyncMock``
+    objects in every test. Request this fixture to inspect the calls, e.g.
+    ``email_hooks.request_verify.call_args``.
+
+    ``on_after_register`` is left alone: it deactivates the new user, which
+    the registration and login tests rely on.
+    """
+    from learn_fastapi_auth.auth.users import UserManager
+
+    hooks = SimpleNamespace(
+        request_verify=AsyncMock(return_value=None),
+        forgot_password=AsyncMock(return_value=None),
+    )
+    monkeypatch.setattr(UserManager, "on_after_request_verify", hooks.request_verify)
+    monkeypatch.setattr(UserManager, "on_after_forgot_password", hooks.forgot_password)
+    return hooks
+
+
+@pytest.fixture(scope="session")
+def event_loop_policy():
+    """
+    Run the async tests on uvloop when it is installed (it comes with
+    ``uvicorn[standard]``), otherwise on the default asyncio loop.
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.DefaultEventLoopPolicy()
+    return uvloop.EventLoopPolicy()
+
+
+@pytest.fixture(scope="session")
+def uniq():
+    """
+    Return a function yielding session-unique integers, used to salt test
+    token strings (cheaper than ``uuid.uuid4()``, which reads urandom).
+    """
+    return itertools.count().__next__
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
 async def test_engine():
-    """Create test database engine."""
-    engine = create_async_engine(TEST_DATABASE_URL, echo=False)
+    """
+    Create the test database engine and schema once per test session.
+
+    ``StaticPool`` keeps the single in-memory database connection for the
+    whole session (it is the aiosqlite default for ``:memory:``; set here so
+    the tests do not depend on that).
+    """
+    engine = create_async_engine(TEST_DATABASE_URL, echo=False, poolclass=StaticPool)
+
+    # The sqlite driver emits BEGIN lazily and breaks SAVEPOINT handling;
+    # take over transaction control so the per-test rollback works.
+    # See "Serializable isolation / Savepoints / Transactional DDL" in the
+    # SQLAlchemy SQLite dialect docs.
+    @event.listens_for(engine.sync_engine, "connect")
+    def _disable_driver_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def _emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     yield engine
@@ -21,15 +148,52 @@ async def test_engine():
 
 
 @pytest_asyncio.fixture
-async def test_session(test_engine) -> AsyncSession:
+async def test_connection(test_engine):
+    """
+    Open a connection wrapped in a transaction that is rolled back after the
+    test, so every test starts from empty tables.
+    """
+    async with test_engine.connect() as conn:
+        trans = await conn.begin()
+        yield conn
+        await trans.rollback()
+
+
+def _make_session(conn) -> AsyncSession:
+    """
+    Session bound to the test connection; its commits release a SAVEPOINT
+    instead of committing the outer per-test transaction.
+    """
+    return AsyncSession(
+        bind=conn,
+        expire_on_commit=False,
+        join_transaction_mode="create_savepoint",
+    )
+
+
+@pytest_asyncio.fixture
+async def test_session(test_connection) -> AsyncSession:
     """Create test database session for direct database operations."""
-    async_session_maker = async_sessionmaker(test_engine, expire_on_commit=False)
-    async with async_session_maker() as session:
+    async with _make_session(test_connection) as session:
         yield session
 
 
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def session_client():
+    """
+    One ``AsyncClient`` (and its connection pool) shared by all tests;
+    :func:`client` resets its per-test state.
+    """
+    from learn_fastapi_auth.app import app
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        yield ac
+
+
 @pytest_asyncio.fixture
-async def client(test_engine):
+async def client(session_client, test_connection):
     """Create test client with overridden database session."""
     from learn_fastapi_auth.app import app
     from learn_fastapi_auth.ratelimit import reset_rate_limit_storage
@@ -37,19 +201,60 @@ async def client(test_engine):
     # Reset rate limit storage before each test to avoid interference
     reset_rate_limit_storage()
 
-    async_session_maker = async_sessionmaker(test_engine, expire_on_commit=False)
-
     async def override_get_async_session():
-        async with async_session_maker() as session:
+        async with _make_session(test_connection) as session:
             yield session
 
     app.dependency_overrides[one.get_async_session] = override_get_async_session
 
-    async with AsyncClient(
-        transport=ASGITransport(app=app), base_url="http://test"
-    ) as ac:
-        yield ac
+    yield session_client
 
+    # Do not leak cookies (CSRF, refresh token) or auth headers into the
+    # next test
+    session_client.cookies.clear()
+    session_client.headers.pop("Authorization", None)
     app.dependency_overrides.clear()
     # Reset rate limit storage after each test as well
     reset_rate_limit_storage()
+
+
+@pytest.fixture(scope="session")
+def test_password_hash() -> str:
+    """
+    Hash :data:`TEST_PASSWORD` once with :data:`CHEAP_PASSWORD_HASH`.
+
+    With ``FAST_TESTS=1`` the password is stored as is, matching the plain
+    comparison installed by :func:`fast_password_hashing`.
+    """
+    if os.environ.get("FAST_TESTS"):
+        return TEST_PASSWORD
+    return CHEAP_PASSWORD_HASH.hash(TEST_PASSWORD)
+
+
+@pytest_asyncio.fixture
+async def auth_user(test_session, test_password_hash):
+    """
+    Active, verified user inserted directly, skipping register and login.
+    Its password is :data:`TEST_PASSWORD`.
+    """
+    from learn_fastapi_auth.models import User
+
+    user = User(
+        email=f"auth_{uuid.uuid4().hex[:8]}@example.com",
+        hashed_password=test_password_hash,
+        is_active=True,
+        is_verified=True,
+    )
+    test_session.add(user)
+    await test_session.commit()
+    return user
+
+
+@pytest_asyncio.fixture
+async def auth_client(client, auth_user):
+    """Test client sending a bearer access token for :func:`auth_user`."""
+    from learn_fastapi_auth.auth.users import get_jwt_strategy
+
+    token = await get_jwt_strategy().write_token(auth_user)
+    client.headers["Authorization"] = f"Bearer {token}"
+    yield client
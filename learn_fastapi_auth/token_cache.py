@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+
+"""
+In-process cache of recently verified tokens.
+
+Tokens are keyed by their SHA-256 digest (see
+:func:`~learn_fastapi_auth.models.hash_token`), so raw tokens are never kept
+in memory. Used to skip the database lookup (access and refresh tokens) or
+the signature check (Firebase ID tokens) for a token seen moments ago.
+"""
+
+import time
+import typing as T
+import uuid
+from collections import OrderedDict
+
+
+class TokenCache:
+    """
+    Bounded LRU of verified tokens with a per-entry expiry.
+
+    Each entry lives for ``min(remaining token lifetime, ttl)`` seconds.
+    Revocation in this process drops entries immediately; revocation done by
+    another worker process becomes visible within ``ttl`` seconds, so keep it
+    short: it is the window in which a revoked token is still accepted.
+
+    Not thread-safe; it is only touched from the event loop.
+
+    :param maxsize: maximum number of entries kept in memory.
+    :param ttl: upper bound in seconds on how long a positive result is reused.
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 5.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[bytes, tuple[T.Any, float]] = OrderedDict()
+
+    def get(self, token_hash: bytes) -> T.Any | None:
+        """
+        Return the cached value (e.g. user id, decoded claims), or None.
+        """
+        entry = self._data.get(token_hash)
+        if entry is None:
+            return None
+        if entry[1] <= time.monotonic():
+            del self._data[token_hash]
+            return None
+        self._data.move_to_end(token_hash)
+        return entry[0]
+
+    def put(self, token_hash: bytes, value: T.Any, remaining_seconds: float):
+        ttl = min(remaining_seconds, self.ttl)
+        if ttl <= 0:
+            return
+        self._data[token_hash] = (value, time.monotonic() + ttl)
+        self._data.move_to_end(token_hash)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def discard_token(self, token_hash: bytes):
+        self._data.pop(token_hash, None)
+
+    def discard_user(self, user_id: uuid.UUID):
+        """
+        Drop every entry whose cached value is this user id.
+        """
+        for key in [k for k, (v, _) in self._data.items() if v == user_id]:
+            del self._data[key]
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
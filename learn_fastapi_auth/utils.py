@@ -1,4 +1,32 @@
 # -*- coding: utf-8 -*-
 
+import os
+import time
+import uuid
+
+
 def add_two(a: int, b: int) -> int:
     return a + b
+
+
+def uuid7() -> uuid.UUID:
+    """
+    Generate a time-ordered UUID version 7 (RFC 9562).
+
+    The first 48 bits are the Unix timestamp in milliseconds and the rest is
+    random, so new ids sort after old ones. Used as primary key default so
+    inserts append to the right edge of the B-tree index instead of landing
+    on random pages like UUID v4.
+    """
+    ts_ms = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10), "big")
+    rand_a = rand >> 68  # 12 bits
+    rand_b = rand & ((1 << 62) - 1)  # 62 bits
+    value = (
+        (ts_ms & ((1 << 48) - 1)) << 80
+        | 0x7 << 76  # version
+        | rand_a << 64
+        | 0b10 << 62  # RFC 4122 variant
+        | rand_b
+    )
+    return uuid.UUID(int=value)
@@ -7,4 +7,8 @@ app = create_app()
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Import string form so ``WEB_CONCURRENCY=N`` can start N worker
+    # processes. ``loop`` / ``http`` stay "auto": uvicorn picks uvloop and
+    # httptools when they are installed (``pip install "uvicorn[standard]"``).
+    # Rate limits and token caches are in-process, so each worker keeps its own.
+    uvicorn.run("main:app", host="0.0.0.0", port=8000)
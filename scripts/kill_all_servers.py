@@ -15,8 +15,16 @@ Usage:
     ./scripts/kill_all_servers.py
 """
 
+from concurrent.futures import ThreadPoolExecutor
+import os
+import re
+import signal
 import subprocess
 import sys
+import time
+
+# Matched against full command lines, like ``pgrep -f``
+SERVER_PATTERN = re.compile(r"uvicorn.*main:app")
 
 
 def find_server_processes():
@@ -24,7 +32,7 @@ def find_server_processes():
     try:
         # Use pgrep to find uvicorn processes
         result = subprocess.run(
-            ["pgrep", "-f", "uvicorn.*main:app"],
+            ["pgrep", "-f", SERVER_PATTERN.pattern],
             capture_output=True,
             text=True,
         )
@@ -37,8 +45,28 @@ def find_server_processes():
         return []
 
 
+def _read_cmdline(pid: int | str) -> str | None:
+    """Return the argv of ``pid`` joined by spaces, None if it is gone."""
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            cmdline = f.read()
+    except OSError:
+        return None
+    return cmdline.replace(b"\x00", b" ").decode(errors="replace").strip()
+
+
 def get_process_info(pid: int) -> str:
-    """Get process command line info."""
+    """
+    Get process command line info.
+
+    Reads the NUL-separated argv from ``/proc/<pid>/cmdline`` on Linux
+    instead of spawning ``ps`` for every PID; ``ps`` is the fallback where
+    ``/proc`` does not exist (macOS).
+    """
+    if os.path.isdir("/proc"):
+        cmdline = _read_cmdline(pid)
+        return "Unknown" if cmdline is None else cmdline
+
     try:
         result = subprocess.run(
             ["ps", "-p", str(pid), "-o", "command="],
@@ -51,21 +79,104 @@ def get_process_info(pid: int) -> str:
 
 
 def kill_process(pid: int) -> bool:
-    """Kill a process by PID."""
+    """
+    Kill a process by PID.
+
+    Sends SIGTERM, waits up to 0.5s for the process to exit, then escalates
+    to SIGKILL. Uses ``os.kill`` directly rather than spawning ``kill``.
+    """
     try:
-        subprocess.run(["kill", str(pid)], check=True)
+        os.kill(pid, signal.SIGTERM)
+    except ProcessLookupError:
         return True
-    except subprocess.CalledProcessError:
-        # Try force kill
+    except PermissionError:
+        return False
+
+    for _ in range(10):
+        time.sleep(0.05)
         try:
-            subprocess.run(["kill", "-9", str(pid)], check=True)
+            os.kill(pid, 0)
+        except ProcessLookupError:
             return True
-        except subprocess.CalledProcessError:
-            return False
+
+    # Try force kill
+    try:
+        os.kill(pid, signal.SIGKILL)
+        return True
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        return False
+
+
+def _listening_socket_inodes(port: int) -> set[str]:
+    """
+    Read ``/proc/net/tcp{,6}`` and return the inodes of sockets in LISTEN
+    state on ``port``.
+    """
+    port_hex = f"{port:04X}"
+    inodes = set()
+    for path in ("/proc/net/tcp", "/proc/net/tcp6"):
+        try:
+            with open(path) as f:
+                next(f)  # header
+                for line in f:
+                    fields = line.split()
+                    # local_address is HEX_IP:HEX_PORT, state 0A is LISTEN
+                    if fields[1].endswith(f":{port_hex}") and fields[3] == "0A":
+                        inodes.add(fields[9])
+        except FileNotFoundError:
+            continue
+    return inodes
+
+
+def _holds_any_socket(pid: str, targets: set[str]) -> bool:
+    """Check whether one of ``pid``'s file descriptors is in ``targets``."""
+    fd_dir = f"/proc/{pid}/fd"
+    try:
+        fds = os.listdir(fd_dir)
+    except OSError:  # process exited or not ours
+        return False
+    for fd in fds:
+        try:
+            if os.readlink(f"{fd_dir}/{fd}") in targets:
+                return True
+        except OSError:
+            continue
+    return False
+
+
+def scan_procs(port: int = 8000) -> tuple[dict[int, str], set[int]]:
+    """
+    Walk ``/proc`` once (Linux only).
+
+    Returns the command line of every visible process (pid -> cmdline) and
+    the PIDs listening on ``port``, so :func:`main` needs no ``pgrep``,
+    ``lsof`` or per-PID ``ps`` call.
+    """
+    targets = {f"socket:[{inode}]" for inode in _listening_socket_inodes(port)}
+    procs = {}
+    port_pids = set()
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        cmdline = _read_cmdline(entry)
+        if cmdline is None:
+            continue
+        pid = int(entry)
+        procs[pid] = cmdline
+        if targets and _holds_any_socket(entry, targets):
+            port_pids.add(pid)
+    return procs, port_pids
 
 
 def find_processes_on_port(port: int = 8000):
-    """Find processes listening on a specific port."""
+    """
+    Find processes listening on a specific port with ``lsof``.
+
+    Only used where ``/proc`` is not available (macOS); on Linux
+    :func:`scan_procs` finds them in the same ``/proc`` walk.
+    """
     try:
         result = subprocess.run(
             ["lsof", "-ti", f":{port}"],
@@ -87,14 +198,27 @@ def main():
     print("Kill All Servers - learn_fastapi_auth")
     print("=" * 50)
 
-    # Find uvicorn processes
-    uvicorn_pids = find_server_processes()
+    if os.path.isdir("/proc"):
+        # One pass over /proc gives both the uvicorn processes and the
+        # processes on port 8000, plus their command lines for display
+        procs, port_pids = scan_procs(8000)
+        uvicorn_pids = {
+            pid
+            for pid, cmdline in procs.items()
+            if SERVER_PATTERN.search(cmdline) and pid != os.getpid()
+        }
+        all_pids = list(uvicorn_pids | port_pids)
+        infos = {pid: procs.get(pid, "Unknown") for pid in all_pids}
+    else:
+        # Find uvicorn processes
+        uvicorn_pids = find_server_processes()
 
-    # Also find any process on port 8000
-    port_pids = find_processes_on_port(8000)
+        # Also find any process on port 8000
+        port_pids = find_processes_on_port(8000)
 
-    # Combine and deduplicate
-    all_pids = list(set(uvicorn_pids + port_pids))
+        # Combine and deduplicate
+        all_pids = list(set(uvicorn_pids + port_pids))
+        infos = {pid: get_process_info(pid) for pid in all_pids}
 
     if not all_pids:
         print("\nNo running servers found.")
@@ -105,16 +229,19 @@ def main():
     print(f"\nFound {len(all_pids)} server process(es):\n")
 
     for pid in all_pids:
-        info = get_process_info(pid)
-        print(f"  PID {pid}: {info[:60]}...")
+        print(f"  PID {pid}: {infos[pid][:60]}...")
 
     print("\nKilling processes...")
 
     killed = 0
     failed = 0
 
-    for pid in all_pids:
-        if kill_process(pid):
+    # Kills are independent, so their TERM grace periods overlap
+    with ThreadPoolExecutor(max_workers=len(all_pids)) as executor:
+        results = list(executor.map(kill_process, all_pids))
+
+    for pid, ok in zip(all_pids, results):
+        if ok:
             print(f"  [OK] Killed PID {pid}")
             killed += 1
         else:
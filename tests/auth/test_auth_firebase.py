@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+
+"""
+Unit tests for learn_fastapi_auth.auth.firebase module.
+
+Tests cover direct function calls (parameter in, parameter out):
+- DiskCache
+- enable_cert_disk_cache()
+- prewarm_cert_cache()
+- verify_firebase_token()
+"""
+
+import uuid
+from unittest.mock import MagicMock, patch
+
+import firebase_admin
+import pytest
+from cachecontrol import CacheControlAdapter
+from firebase_admin import auth, credentials
+
+from learn_fastapi_auth.auth.firebase import (
+    MAX_ID_TOKEN_LENGTH,
+    DiskCache,
+    FirebaseTokenInvalidError,
+    enable_cert_disk_cache,
+    ensure_private_dir,
+    get_cert_cache_dir,
+    prewarm_cert_cache,
+    verify_firebase_token,
+)
+from learn_fastapi_auth.one.api import one
+
+
+class _FakeCredential(credentials.Base):
+    def get_credential(self):  # pragma: no cover
+        return None
+
+
+class TestDiskCache:
+    """Test the file-per-key cachecontrol cache."""
+
+    def test_set_get_delete(self, tmp_path):
+        """Test that values round-trip through files and can be deleted."""
+        cache = DiskCache(ensure_private_dir(tmp_path / "certs"))
+
+        assert cache.get("https://example.com/certs") is None
+        cache.set("https://example.com/certs", b"payload")
+        assert cache.get("https://example.com/certs") == b"payload"
+
+        cache.delete("https://example.com/certs")
+        assert cache.get("https://example.com/certs") is None
+
+    def test_survives_new_instance(self, tmp_path):
+        """Test that a new cache on the same directory sees stored values."""
+        DiskCache(tmp_path).set("key", b"value")
+        assert DiskCache(tmp_path).get("key") == b"value"
+
+
+class TestEnsurePrivateDir:
+    """Test the ownership and mode checks on the certificate cache dir."""
+
+    def test_creates_dir_with_mode_0700(self, tmp_path):
+        """Test that a missing directory is created private to the user."""
+        directory = ensure_private_dir(tmp_path / "certs")
+
+        assert directory.is_dir()
+        assert directory.stat().st_mode & 0o777 == 0o700
+
+    def test_rejects_dir_open_to_others(self, tmp_path):
+        """Test that a directory accessible to group or others is refused."""
+        directory = tmp_path / "certs"
+        directory.mkdir()
+        directory.chmod(0o755)
+
+        with pytest.raises(PermissionError):
+            ensure_private_dir(directory)
+
+    def test_rejects_dir_of_other_owner(self, tmp_path):
+        """Test that a directory owned by another user is refused."""
+        directory = ensure_private_dir(tmp_path / "certs")
+
+        with patch("learn_fastapi_auth.auth.firebase.os.getuid", return_value=-1):
+            with pytest.raises(PermissionError):
+                ensure_private_dir(directory)
+
+
+class TestGetCertCacheDir:
+    """Test where the certificate cache lives."""
+
+    def test_configured_dir_per_project(self, tmp_path):
+        """Test that the configured root gets one subdirectory per project."""
+        app = MagicMock(project_id="test-project")
+        env = one.env.model_copy(update={"firebase_cert_cache_dir": str(tmp_path)})
+        with patch.object(one, "env", env):
+            assert get_cert_cache_dir(app) == tmp_path / "test-project"
+
+
+class TestEnableCertDiskCache:
+    """Test mounting the disk cache on the Admin SDK certificate session."""
+
+    def test_mounts_adapter(self, tmp_path):
+        """Test that certificate fetches go through a DiskCache adapter."""
+        app = firebase_admin.initialize_app(
+            _FakeCredential(),
+            options={"projectId": "test-project"},
+            name=f"test-{uuid.uuid4().hex}",
+        )
+        try:
+            enable_cert_disk_cache(app, tmp_path)
+
+            session = auth._get_client(app)._token_verifier.request.session
+            adapter = session.get_adapter("https://www.googleapis.com/")
+            assert isinstance(adapter, CacheControlAdapter)
+            assert isinstance(adapter.cache, DiskCache)
+            assert adapter.cache.directory == tmp_path
+        finally:
+            firebase_admin.delete_app(app)
+
+    def test_skips_without_sdk_internals(self, tmp_path):
+        """Test that a missing private SDK attribute skips the cache."""
+        with patch.object(auth, "_get_client", return_value=object()):
+            enable_cert_disk_cache(MagicMock(), tmp_path / "certs")
+
+        assert not (tmp_path / "certs").exists()
+
+
+class TestPrewarmCertCache:
+    """Test fetching the signing certificates ahead of the first login."""
+
+    def test_fetches_id_token_certs(self):
+        """Test that the ID token certificate URL is requested once."""
+        app = firebase_admin.initialize_app(
+            _FakeCredential(),
+            options={"projectId": "test-project"},
+            name=f"test-{uuid.uuid4().hex}",
+        )
+        try:
+            verifier = auth._get_client(app)._token_verifier
+            with patch.object(verifier, "request", MagicMock()) as mock_request:
+                prewarm_cert_cache(app)
+
+            mock_request.assert_called_once_with(
+                verifier.id_token_verifier.cert_url
+            )
+        finally:
+            firebase_admin.delete_app(app)
+
+    def test_skips_without_sdk_internals(self):
+        """Test that a missing private SDK attribute skips the prewarm."""
+        with patch.object(auth, "_get_client", return_value=object()):
+            prewarm_cert_cache(MagicMock())
+
+
+class TestVerifyFirebaseToken:
+    """Test the cheap shape checks done before signature verification."""
+
+    @pytest.mark.parametrize(
+        "id_token",
+        ["not-a-jwt", "a.b", "a.b.c.d", "a." + "b" * MAX_ID_TOKEN_LENGTH + ".c"],
+    )
+    def test_malformed_token_rejected_before_verify(self, id_token):
+        """Test that malformed tokens never reach the Admin SDK."""
+        with (
+            patch.object(type(one), "is_firebase_initialized", True),
+            patch.object(auth, "verify_id_token") as mock_verify,
+        ):
+            with pytest.raises(FirebaseTokenInvalidError):
+                verify_firebase_token(id_token)
+
+        mock_verify.assert_not_called()
+
+
+if __name__ == "__main__":
+    from learn_fastapi_auth.tests import run_cov_test
+
+    run_cov_test(
+        __file__,
+        "learn_fastapi_auth.auth.firebase",
+        preview=False,
+    )
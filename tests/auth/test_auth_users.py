@@ -4,25 +4,95 @@
 Unit tests for learn_fastapi_auth.auth.users module.
 
 Tests cover direct function calls (parameter in, parameter out):
+- UserDatabase lookups
+- password_helper
 - get_jwt_strategy()
 - store_token()
+- store_tokens()
 - delete_token()
 - validate_token_in_db()
+- valid_tokens cache
+- revoke_all_user_tokens()
+- cleanup_expired_access_tokens()
 """
 
 import uuid
 from datetime import datetime, timedelta, timezone
+from typing import Callable
+from unittest.mock import patch
 
+import bcrypt
+import pytest
 from sqlalchemy import select
+from sqlalchemy.exc import InvalidRequestError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from learn_fastapi_auth.auth.users import (
+    UserDatabase,
+    cleanup_expired_access_tokens,
     delete_token,
     get_jwt_strategy,
+    password_helper,
+    revoke_all_user_tokens,
     store_token,
+    store_tokens,
+    valid_tokens,
     validate_token_in_db,
 )
-from learn_fastapi_auth.models import Token
+from learn_fastapi_auth.models import Token, User, hash_token
+
+
+@pytest.fixture
+async def user_id(test_session: AsyncSession) -> uuid.UUID:
+    """Insert a user so stored tokens satisfy the ``users.id`` foreign key."""
+    user = User(
+        email=f"token_user_{uuid.uuid4().hex[:8]}@example.com",
+        hashed_password="hashed_password_123",
+    )
+    test_session.add(user)
+    await test_session.commit()
+    return user.id
+
+
+class TestUserDatabase:
+    """Test the raiseload-guarded user database adapter."""
+
+    async def test_lazy_load_raises(
+        self,
+        test_session: AsyncSession,
+        user_id: uuid.UUID,
+    ):
+        """Test that relationships are not lazily loaded on fetched users."""
+        test_session.expunge_all()
+        user_db = UserDatabase(test_session, User)
+
+        user = await user_db.get(user_id)
+
+        assert user is not None
+        with pytest.raises(InvalidRequestError):
+            _ = user.tokens
+
+
+@pytest.mark.slow
+class TestPasswordHelper:
+    """Test password hashing configuration."""
+
+    def test_hashes_with_tuned_argon2id(self):
+        """Test new hashes use argon2id with the configured cost."""
+        hashed = password_helper.hash("correct horse")
+        assert hashed.startswith("$argon2id$v=19$m=19456,t=2,p=1$")
+
+        verified, updated = password_helper.verify_and_update("correct horse", hashed)
+        assert verified is True
+        assert updated is None
+
+    def test_rehashes_legacy_bcrypt(self):
+        """Test bcrypt hashes still verify and are upgraded to argon2id."""
+        legacy = bcrypt.hashpw(b"correct horse", bcrypt.gensalt(rounds=4)).decode()
+
+        verified, updated = password_helper.verify_and_update("correct horse", legacy)
+        assert verified is True
+        assert updated.startswith("$argon2id$")
 
 
 class TestJWTStrategy:
@@ -41,24 +111,26 @@ class TestTokenManagement:
     async def test_store_token(
         self,
         test_session: AsyncSession,
+        user_id: uuid.UUID,
+        uniq: Callable[[], int],
     ):
         """Test storing a token in database."""
-        user_id = uuid.uuid4()
-        token_str = f"test_token_{uuid.uuid4().hex}"
+        token_str = f"test_token_{uniq()}"
 
         token = await store_token(test_session, token_str, user_id)
 
-        assert token.token == token_str
+        assert token.token_hash == hash_token(token_str)
         assert token.user_id == user_id
         assert token.expires_at > datetime.now(timezone.utc)
 
     async def test_validate_token_in_db_valid(
         self,
         test_session: AsyncSession,
+        user_id: uuid.UUID,
+        uniq: Callable[[], int],
     ):
         """Test validating a valid token."""
-        user_id = uuid.uuid4()
-        token_str = f"valid_token_{uuid.uuid4().hex}"
+        token_str = f"valid_token_{uniq()}"
 
         await store_token(test_session, token_str, user_id)
         is_valid = await validate_token_in_db(test_session, token_str)
@@ -76,14 +148,15 @@ class TestTokenManagement:
     async def test_validate_token_in_db_expired(
         self,
         test_session: AsyncSession,
+        user_id: uuid.UUID,
+        uniq: Callable[[], int],
     ):
         """Test validating an expired token."""
-        user_id = uuid.uuid4()
-        token_str = f"expired_token_{uuid.uuid4().hex}"
+        token_str = f"expired_token_{uniq()}"
 
         # Manually create expired token
         expired_token = Token(
-            token=token_str,
+            token_hash=hash_token(token_str),
             user_id=user_id,
             expires_at=datetime.now(timezone.utc) - timedelta(hours=1),
         )
@@ -93,13 +166,28 @@ class TestTokenManagement:
         is_valid = await validate_token_in_db(test_session, token_str)
         assert is_valid is False
 
+    async def test_validate_token_in_db_uses_given_now(
+        self,
+        test_session: AsyncSession,
+        user_id: uuid.UUID,
+        uniq: Callable[[], int],
+    ):
+        """Test that expiry is checked against the caller supplied time."""
+        token_str = f"now_token_{uniq()}"
+        await store_token(test_session, token_str, user_id)
+
+        later = datetime.now(timezone.utc) + timedelta(days=365)
+        assert await validate_token_in_db(test_session, token_str, now=later) is False
+        assert await validate_token_in_db(test_session, token_str) is True
+
     async def test_delete_token_success(
         self,
         test_session: AsyncSession,
+        user_id: uuid.UUID,
+        uniq: Callable[[], int],
     ):
         """Test deleting an existing token."""
-        user_id = uuid.uuid4()
-        token_str = f"delete_token_{uuid.uuid4().hex}"
+        token_str = f"delete_token_{uniq()}"
 
         await store_token(test_session, token_str, user_id)
         result = await delete_token(test_session, token_str)
@@ -108,7 +196,7 @@ class TestTokenManagement:
 
         # Verify token is deleted
         query_result = await test_session.execute(
-            select(Token).where(Token.token == token_str)
+            select(Token).where(Token.token_hash == hash_token(token_str))
         )
         assert query_result.scalar_one_or_none() is None
 
@@ -120,6 +208,108 @@ class TestTokenManagement:
         result = await delete_token(test_session, "non_existent_token")
         assert result is False
 
+    async def test_validate_token_in_db_cached(
+        self,
+        test_session: AsyncSession,
+        user_id: uuid.UUID,
+        uniq: Callable[[], int],
+    ):
+        """Test that a validated token is served from the cache until logout."""
+        valid_tokens.clear()
+        token_str = f"cached_token_{uniq()}"
+        await store_token(test_session, token_str, user_id)
+        assert await validate_token_in_db(test_session, token_str) is True
+
+        with patch.object(test_session, "execute") as mock_execute:
+            assert await validate_token_in_db(test_session, token_str) is True
+            mock_execute.assert_not_called()
+
+        await delete_token(test_session, token_str)
+        assert await validate_token_in_db(test_session, token_str) is False
+
+    async def test_delete_token_drops_token_cached_before_commit(
+        self,
+        test_session: AsyncSession,
+        user_id: uuid.UUID,
+        uniq: Callable[[], int],
+    ):
+        """Test that a lookup caching the token mid-logout is undone."""
+        valid_tokens.clear()
+        token_str = f"racing_token_{uniq()}"
+        await store_token(test_session, token_str, user_id)
+        commit = test_session.commit
+
+        async def commit_after_concurrent_lookup():
+            # A concurrent validate_token_in_db still sees the uncommitted row
+            valid_tokens.put(hash_token(token_str), user_id, 3600)
+            await commit()
+
+        with patch.object(test_session, "commit", commit_after_concurrent_lookup):
+            await delete_token(test_session, token_str)
+
+        assert valid_tokens.get(hash_token(token_str)) is None
+
+    async def test_store_tokens(
+        self,
+        test_session: AsyncSession,
+        user_id: uuid.UUID,
+        uniq: Callable[[], int],
+    ):
+        """Test storing several tokens with one INSERT."""
+        token_strs = [f"bulk_token_{uniq()}" for _ in range(3)]
+
+        count = await store_tokens(test_session, token_strs, user_id)
+
+        assert count == 3
+        for token_str in token_strs:
+            assert await validate_token_in_db(test_session, token_str) is True
+        assert await store_tokens(test_session, [], user_id) == 0
+
+    async def test_revoke_all_user_tokens(
+        self,
+        test_session: AsyncSession,
+        user_id: uuid.UUID,
+        uniq: Callable[[], int],
+    ):
+        """Test deleting every token of a user in one statement."""
+        token_strs = [f"revoke_all_{uniq()}" for _ in range(3)]
+        await store_tokens(test_session, token_strs, user_id)
+        token_str = token_strs[-1]
+
+        assert await validate_token_in_db(test_session, token_str) is True
+
+        count = await revoke_all_user_tokens(test_session, user_id)
+
+        assert count == 3
+        assert await validate_token_in_db(test_session, token_str) is False
+        query_result = await test_session.execute(
+            select(Token).where(Token.user_id == user_id)
+        )
+        assert query_result.first() is None
+
+    async def test_cleanup_expired_access_tokens(
+        self,
+        test_session: AsyncSession,
+        user_id: uuid.UUID,
+        uniq: Callable[[], int],
+    ):
+        """Test that only expired tokens are deleted."""
+        valid_token_str = f"valid_token_{uniq()}"
+        await store_token(test_session, valid_token_str, user_id)
+        test_session.add(
+            Token(
+                token_hash=hash_token(f"expired_token_{uniq()}"),
+                user_id=user_id,
+                expires_at=datetime.now(timezone.utc) - timedelta(hours=1),
+            )
+        )
+        await test_session.commit()
+
+        count = await cleanup_expired_access_tokens(test_session)
+
+        assert count == 1
+        assert await validate_token_in_db(test_session, valid_token_str) is True
+
 
 if __name__ == "__main__":
     from learn_fastapi_auth.tests import run_cov_test
@@ -13,8 +13,15 @@ Tests cover:
 import uuid
 from unittest.mock import AsyncMock, patch
 
+import pytest
 from httpx import AsyncClient
 
+from learn_fastapi_auth.core.middleware import HealthCheckMiddleware
+from learn_fastapi_auth.models import User
+from learn_fastapi_auth.one.api import one
+from learn_fastapi_auth.refresh_token import revoke_all_user_refresh_tokens
+from learn_fastapi_auth.tests.conftest import TEST_PASSWORD
+
 
 class TestHealthCheck:
     """Test health check endpoint."""
@@ -25,18 +32,56 @@ class TestHealthCheck:
         assert response.status_code == 200
         assert response.json() == {"status": "healthy"}
 
+    async def test_health_check_skips_inner_app(self):
+        """Test the middleware answers /health without calling the app."""
+        inner_app = AsyncMock()
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        middleware = HealthCheckMiddleware(inner_app)
+        await middleware(
+            {"type": "http", "path": "/health", "method": "GET"}, AsyncMock(), send
+        )
+
+        inner_app.assert_not_called()
+        assert sent[0]["status"] == 200
+        assert sent[1]["body"] == b'{"status":"healthy"}'
+
+        await middleware(
+            {"type": "http", "path": "/api/users/me", "method": "GET"}, None, send
+        )
+        inner_app.assert_awaited_once()
+
+
+class TestPageRedirects:
+    """Test email link redirects to the frontend."""
+
+    async def test_verify_email_redirect(self, client: AsyncClient):
+        """Test verification link redirects with the token appended."""
+        response = await client.get("/auth/verify-email", params={"token": "a.b-c_d"})
+        assert response.status_code == 302
+        assert response.headers["location"].endswith(
+            "/signin?verified=pending&token=a.b-c_d"
+        )
+
+    async def test_reset_password_redirect_encodes_token(self, client: AsyncClient):
+        """Test reserved characters in the token are percent-encoded."""
+        response = await client.get("/auth/reset-password", params={"token": "a&b=c"})
+        assert response.status_code == 302
+        assert response.headers["location"].endswith("/reset-password?token=a%26b%3Dc")
+
 
 class TestUserRegistration:
     """Test user registration endpoint."""
 
-    @patch("learn_fastapi_auth.auth.users.UserManager.on_after_request_verify")
+    @pytest.mark.slow
     async def test_register_user_success(
         self,
-        mock_verify: AsyncMock,
         client: AsyncClient,
     ):
         """Test successful user registration."""
-        mock_verify.return_value = None
 
         user_data = {
             "email": f"test_{uuid.uuid4().hex[:8]}@example.com",
@@ -52,6 +97,31 @@ class TestUserRegistration:
         assert data["is_active"] is False
         assert data["is_verified"] is False
 
+    async def test_verify_activates_user(
+        self,
+        client: AsyncClient,
+        email_hooks,
+    ):
+        """Test verification activates the user and serializes it without a refresh."""
+
+        user_data = {
+            "email": f"verify_{uuid.uuid4().hex[:8]}@example.com",
+            "password": "TestPass123!",
+        }
+        response = await client.post("/api/auth/register", json=user_data)
+        assert response.status_code == 201
+        assert response.json()["updated_at"] is not None
+
+        # on_after_request_verify(user, token, request)
+        token = email_hooks.request_verify.call_args.args[1]
+        response = await client.post("/api/auth/verify", json={"token": token})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["is_active"] is True
+        assert data["is_verified"] is True
+        assert data["updated_at"] is not None
+
     async def test_register_user_invalid_email(self, client: AsyncClient):
         """Test registration fails with invalid email."""
         user_data = {"email": "invalid-email", "password": "TestPass123!"}
@@ -59,14 +129,11 @@ class TestUserRegistration:
 
         assert response.status_code == 422  # Validation error
 
-    @patch("learn_fastapi_auth.auth.users.UserManager.on_after_request_verify")
     async def test_register_user_duplicate_email(
         self,
-        mock_verify: AsyncMock,
         client: AsyncClient,
     ):
         """Test registration fails with duplicate email."""
-        mock_verify.return_value = None
 
         email = f"duplicate_{uuid.uuid4().hex[:8]}@example.com"
         user_data = {"email": email, "password": "TestPass123!"}
@@ -83,16 +150,14 @@ class TestUserRegistration:
 class TestUserLogin:
     """Test user login endpoint."""
 
+    @pytest.mark.slow
     @patch("learn_fastapi_auth.auth.users.UserManager.on_after_register")
-    @patch("learn_fastapi_auth.auth.users.UserManager.on_after_request_verify")
     async def test_login_success(
         self,
-        mock_verify: AsyncMock,
         mock_register: AsyncMock,
         client: AsyncClient,
     ):
         """Test successful user login."""
-        mock_verify.return_value = None
         mock_register.return_value = None  # Skip deactivation for this test
 
         # First register a user
@@ -117,14 +182,11 @@ class TestUserLogin:
 
         assert response.status_code == 400
 
-    @patch("learn_fastapi_auth.auth.users.UserManager.on_after_request_verify")
     async def test_login_unverified_user_fails(
         self,
-        mock_verify: AsyncMock,
         client: AsyncClient,
     ):
         """Test login fails for user who hasn't verified email."""
-        mock_verify.return_value = None
 
         # Register a user (will be inactive until verified)
         email = f"unverified_{uuid.uuid4().hex[:8]}@example.com"
@@ -163,53 +225,41 @@ class TestProtectedRoutes:
         )
         assert response.status_code == 401
 
-    @patch("learn_fastapi_auth.auth.users.UserManager.on_after_register")
-    @patch("learn_fastapi_auth.auth.users.UserManager.on_after_request_verify")
-    async def test_get_users_me(
-        self,
-        mock_verify: AsyncMock,
-        mock_register: AsyncMock,
-        client: AsyncClient,
-    ):
-        """Test getting current user info with valid token."""
-        mock_verify.return_value = None
-        mock_register.return_value = None  # Skip deactivation for this test
+    async def test_user_data_create_and_update(self, auth_client: AsyncClient):
+        """Test user data is created on first read and upserted on update."""
+        # First read creates the row
+        response = await auth_client.get("/api/user-data")
+        assert response.status_code == 200
+        assert response.json()["text_value"] == ""
 
-        # Register and login
-        email = f"me_test_{uuid.uuid4().hex[:8]}@example.com"
-        password = "TestPass123!"
-        await client.post(
-            "/api/auth/register", json={"email": email, "password": password}
-        )
-        login_response = await client.post(
-            "/api/auth/login", data={"username": email, "password": password}
-        )
-        token = login_response.json()["access_token"]
+        # Update goes through the upsert and returns the new row
+        response = await auth_client.put("/api/user-data", json={"text_value": "hello"})
+        assert response.status_code == 200
+        assert response.json()["text_value"] == "hello"
 
-        # Get current user info
-        response = await client.get(
-            "/api/users/me", headers={"Authorization": f"Bearer {token}"}
-        )
+        response = await auth_client.get("/api/user-data")
+        assert response.json()["text_value"] == "hello"
+
+    async def test_get_users_me(self, auth_client: AsyncClient, auth_user: User):
+        """Test getting current user info with valid token."""
+        response = await auth_client.get("/api/users/me")
 
         assert response.status_code == 200
         data = response.json()
-        assert data["email"] == email
+        assert data["email"] == auth_user.email
+        # auth_user is created directly, so has_set_password stays False
+        assert data["is_oauth_user"] is True
+        assert "has_set_password" not in data
 
 
 class TestPasswordReset:
     """Test password reset endpoints."""
 
-    @patch("learn_fastapi_auth.auth.users.UserManager.on_after_forgot_password")
-    @patch("learn_fastapi_auth.auth.users.UserManager.on_after_request_verify")
     async def test_forgot_password_existing_email(
         self,
-        mock_verify: AsyncMock,
-        mock_forgot: AsyncMock,
         client: AsyncClient,
     ):
         """Test forgot password for existing user."""
-        mock_verify.return_value = None
-        mock_forgot.return_value = None
 
         # Register a user first
         email = f"forgot_test_{uuid.uuid4().hex[:8]}@example.com"
@@ -247,82 +297,50 @@ class TestPasswordReset:
 class TestChangePassword:
     """Test change password endpoint."""
 
-    @patch("learn_fastapi_auth.auth.users.UserManager.on_after_register")
-    @patch("learn_fastapi_auth.auth.users.UserManager.on_after_request_verify")
+    @patch(
+        "learn_fastapi_auth.routers.auth_routes.revoke_all_user_refresh_tokens",
+        side_effect=revoke_all_user_refresh_tokens,
+    )
     async def test_change_password_success(
         self,
-        mock_verify: AsyncMock,
-        mock_register: AsyncMock,
-        client: AsyncClient,
+        mock_revoke_all: AsyncMock,
+        auth_client: AsyncClient,
+        auth_user: User,
     ):
         """Test changing password with correct current password."""
-        mock_verify.return_value = None
-        mock_register.return_value = None
-
-        # Register and login
-        email = f"change_pw_{uuid.uuid4().hex[:8]}@example.com"
-        old_password = "OldPass123!"
         new_password = "NewPass456!"
 
-        await client.post(
-            "/api/auth/register", json={"email": email, "password": old_password}
-        )
-        login_response = await client.post(
-            "/api/auth/login", data={"username": email, "password": old_password}
-        )
-        token = login_response.json()["access_token"]
-
         # Change password
-        response = await client.post(
+        response = await auth_client.post(
             "/api/auth/change-password",
-            json={"current_password": old_password, "new_password": new_password},
-            headers={"Authorization": f"Bearer {token}"},
+            json={"current_password": TEST_PASSWORD, "new_password": new_password},
         )
 
         assert response.status_code == 200
         assert response.json()["message"] == "Password changed successfully"
 
+        # Verify refresh tokens on other devices are revoked
+        mock_revoke_all.assert_awaited_once()
+
         # Verify old password no longer works
-        login_old = await client.post(
-            "/api/auth/login", data={"username": email, "password": old_password}
+        login_old = await auth_client.post(
+            "/api/auth/login",
+            data={"username": auth_user.email, "password": TEST_PASSWORD},
         )
         assert login_old.status_code == 400
 
         # Verify new password works
-        login_new = await client.post(
-            "/api/auth/login", data={"username": email, "password": new_password}
+        login_new = await auth_client.post(
+            "/api/auth/login",
+            data={"username": auth_user.email, "password": new_password},
         )
         assert login_new.status_code == 200
 
-    @patch("learn_fastapi_auth.auth.users.UserManager.on_after_register")
-    @patch("learn_fastapi_auth.auth.users.UserManager.on_after_request_verify")
-    async def test_change_password_wrong_current(
-        self,
-        mock_verify: AsyncMock,
-        mock_register: AsyncMock,
-        client: AsyncClient,
-    ):
+    async def test_change_password_wrong_current(self, auth_client: AsyncClient):
         """Test changing password with wrong current password."""
-        mock_verify.return_value = None
-        mock_register.return_value = None
-
-        # Register and login
-        email = f"wrong_pw_{uuid.uuid4().hex[:8]}@example.com"
-        password = "TestPass123!"
-
-        await client.post(
-            "/api/auth/register", json={"email": email, "password": password}
-        )
-        login_response = await client.post(
-            "/api/auth/login", data={"username": email, "password": password}
-        )
-        token = login_response.json()["access_token"]
-
-        # Try to change password with wrong current password
-        response = await client.post(
+        response = await auth_client.post(
             "/api/auth/change-password",
             json={"current_password": "WrongPassword!", "new_password": "NewPass456!"},
-            headers={"Authorization": f"Bearer {token}"},
         )
 
         assert response.status_code == 400
@@ -337,6 +355,67 @@ class TestChangePassword:
         assert response.status_code == 401
 
 
+class TestFirebaseLogin:
+    """Test Firebase OAuth login endpoint."""
+
+    @staticmethod
+    def _claims(uid: str, email: str) -> dict:
+        return {
+            "uid": uid,
+            "email": email,
+            "email_verified": True,
+            "firebase": {"sign_in_provider": "google.com"},
+        }
+
+    async def _login(self, client: AsyncClient, claims: dict):
+        with (
+            patch.object(
+                one, "env", one.env.model_copy(update={"firebase_enabled": True})
+            ),
+            patch(
+                "learn_fastapi_auth.routers.auth_routes.verify_firebase_token",
+                return_value=claims,
+            ),
+        ):
+            return await client.post(
+                "/api/auth/firebase", json={"id_token": "test-id-token"}
+            )
+
+    async def test_creates_then_finds_user_by_uid(self, client: AsyncClient):
+        """Test first login creates the user, next login finds it by UID."""
+        uid = f"uid_{uuid.uuid4().hex}"
+        email = f"firebase_{uuid.uuid4().hex[:8]}@example.com"
+
+        first = await self._login(client, self._claims(uid, email))
+        assert first.status_code == 200
+        assert first.json()["is_new_user"] is True
+
+        second = await self._login(client, self._claims(uid, email))
+        assert second.status_code == 200
+        assert second.json()["is_new_user"] is False
+
+    @patch("learn_fastapi_auth.auth.users.UserManager.on_after_register")
+    async def test_links_existing_user_by_email(
+        self,
+        mock_register: AsyncMock,
+        client: AsyncClient,
+    ):
+        """Test login links the Firebase UID to a password-registered user."""
+        mock_register.return_value = None
+        email = f"firebase_{uuid.uuid4().hex[:8]}@example.com"
+        await client.post(
+            "/api/auth/register", json={"email": email, "password": "Pass123!"}
+        )
+
+        response = await self._login(
+            client, self._claims(f"uid_{uuid.uuid4().hex}", email)
+        )
+
+        assert response.status_code == 200
+        assert response.json()["is_new_user"] is False
+        assert response.json()["email"] == email
+
+
 if __name__ == "__main__":
     from learn_fastapi_auth.tests import run_cov_test
 
@@ -8,14 +8,17 @@ Integration tests (actual HTTP requests with CSRF validation) should be done man
 """
 
 import re
-from unittest.mock import MagicMock
+from types import SimpleNamespace
 
 import pytest
 
 from learn_fastapi_auth.csrf import (
+    FastCSRFMiddleware,
+    combine_patterns,
     create_csrf_exempt_patterns,
     create_csrf_required_patterns,
     get_csrf_cookie_name,
+    get_csrf_exempt_matcher,
     get_csrf_header_name,
     get_csrf_token,
 )
@@ -26,8 +29,7 @@ class TestGetCSRFToken:
 
     def test_returns_token_when_present(self):
         """Test that CSRF token is returned when present in cookies."""
-        mock_request = MagicMock()
-        mock_request.cookies = {"csrftoken": "test-token-123"}
+        mock_request = SimpleNamespace(cookies={"csrftoken": "test-token-123"})
 
         result = get_csrf_token(mock_request)
 
@@ -35,8 +37,7 @@ class TestGetCSRFToken:
 
     def test_returns_none_when_missing(self):
         """Test that None is returned when CSRF token is not in cookies."""
-        mock_request = MagicMock()
-        mock_request.cookies = {}
+        mock_request = SimpleNamespace(cookies={})
 
         result = get_csrf_token(mock_request)
 
@@ -44,8 +45,7 @@ class TestGetCSRFToken:
 
     def test_returns_none_with_different_cookie(self):
         """Test that None is returned when a different cookie exists."""
-        mock_request = MagicMock()
-        mock_request.cookies = {"other_cookie": "some-value"}
+        mock_request = SimpleNamespace(cookies={"other_cookie": "some-value"})
 
         result = get_csrf_token(mock_request)
 
@@ -64,9 +64,22 @@ class TestCreateCSRFExemptPatterns:
         for pattern in patterns:
             assert isinstance(pattern, re.Pattern)
 
+    def test_patterns_are_compiled_once(self):
+        """Test that repeated calls return the cached pattern list."""
+        assert create_csrf_exempt_patterns() is create_csrf_exempt_patterns()
+
+    def test_combined_matcher_agrees_with_patterns(self):
+        """Test that the combined matcher matches exactly what the list does."""
+        patterns = create_csrf_exempt_patterns()
+        matcher = combine_patterns(patterns)
+
+        for url in ["/api/x", "/health", "/healthz", "/docs", "/admin/", "/app"]:
+            expected = any(p.match(url) for p in patterns)
+            assert bool(matcher.match(url)) is expected, url
+
     def test_api_routes_are_exempt(self):
         """Test that /api/* routes are marked as exempt."""
-        patterns = create_csrf_exempt_patterns()
+        matcher = get_csrf_exempt_matcher()
 
         test_urls = [
             "/api/auth/login",
@@ -76,19 +89,19 @@ class TestCreateCSRFExemptPatterns:
         ]
 
         for url in test_urls:
-            matches = any(p.match(url) for p in patterns)
+            matches = matcher.match(url)
             assert matches, f"Expected {url} to be exempt"
 
     def test_health_endpoint_is_exempt(self):
         """Test that /health endpoint is marked as exempt."""
-        patterns = create_csrf_exempt_patterns()
+        matcher = get_csrf_exempt_matcher()
 
-        matches = any(p.match("/health") for p in patterns)
+        matches = matcher.match("/health")
         assert matches
 
     def test_static_files_are_exempt(self):
         """Test that /static/* routes are marked as exempt."""
-        patterns = create_csrf_exempt_patterns()
+        matcher = get_csrf_exempt_matcher()
 
         test_urls = [
             "/static/css/style.css",
@@ -97,12 +110,12 @@ class TestCreateCSRFExemptPatterns:
         ]
 
         for url in test_urls:
-            matches = any(p.match(url) for p in patterns)
+            matches = matcher.match(url)
             assert matches, f"Expected {url} to be exempt"
 
     def test_docs_endpoints_are_exempt(self):
         """Test that API documentation endpoints are marked as exempt."""
-        patterns = create_csrf_exempt_patterns()
+        matcher = get_csrf_exempt_matcher()
 
         test_urls = [
             "/docs",
@@ -113,12 +126,12 @@ class TestCreateCSRFExemptPatterns:
         ]
 
         for url in test_urls:
-            matches = any(p.match(url) for p in patterns)
+            matches = matcher.match(url)
             assert matches, f"Expected {url} to be exempt"
 
     def test_page_routes_are_not_exempt(self):
         """Test that HTML page routes are NOT marked as exempt."""
-        patterns = create_csrf_exempt_patterns()
+        matcher = get_csrf_exempt_matcher()
 
         test_urls = [
             "/signin",
@@ -128,7 +141,7 @@ class TestCreateCSRFExemptPatterns:
         ]
 
         for url in test_urls:
-            matches = any(p.match(url) for p in patterns)
+            matches = matcher.match(url)
             assert not matches, f"Expected {url} to NOT be exempt"
 
 
@@ -161,3 +174,84 @@ class TestGetCSRFCookieName:
 
         # Default value from config
         assert result == "csrftoken"
+
+
+class TestFastCSRFMiddleware:
+    """Tests for FastCSRFMiddleware class."""
+
+    @staticmethod
+    def _make_middleware(calls: list) -> FastCSRFMiddleware:
+        async def app(scope, receive, send):
+            calls.append(scope["path"])
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        return FastCSRFMiddleware(
+            app,
+            secret="test-secret",
+            exempt_urls=create_csrf_exempt_patterns(),
+        )
+
+    @staticmethod
+    async def _post(middleware: FastCSRFMiddleware, path: str) -> list:
+        scope = {
+            "type": "http",
+            "method": "POST",
+            "path": path,
+            "query_string": b"",
+            "headers": [],
+        }
+        messages = []
+
+        async def receive():
+            return {"type": "http.request", "body": b""}
+
+        async def send(message):
+            messages.append(message)
+
+        await middleware(scope, receive, send)
+        return messages
+
+    async def test_api_path_bypasses_csrf(self):
+        """Test that /api/* requests skip CSRF checks and the CSRF cookie."""
+        calls = []
+        middleware = self._make_middleware(calls)
+
+        messages = await self._post(middleware, "/api/auth/login")
+
+        assert calls == ["/api/auth/login"]
+        assert messages[0]["status"] == 200
+        assert all(name != b"set-cookie" for name, _ in messages[0]["headers"])
+
+    @pytest.mark.parametrize(
+        "path", ["/static/js/app.js", "/health", "/docs", "/openapi.json"]
+    )
+    async def test_fixed_exempt_paths_bypass_csrf(self, path: str):
+        """Test that static files and the fixed exempt paths skip the middleware."""
+        calls = []
+        middleware = self._make_middleware(calls)
+
+        messages = await self._post(middleware, path)
+
+        assert calls == [path]
+        assert all(name != b"set-cookie" for name, _ in messages[0]["headers"])
+
+    async def test_non_exempt_path_requires_csrf(self):
+        """Test that other paths still go through CSRF validation."""
+        calls = []
+        middleware = self._make_middleware(calls)
+
+        messages = await self._post(middleware, "/signin")
+
+        assert calls == []
+        assert messages[0]["status"] == 403
+
+    async def test_exempt_pattern_skips_csrf_check(self):
+        """Test that paths matching the combined exempt regex skip validation."""
+        calls = []
+        middleware = self._make_middleware(calls)
+
+        messages = await self._post(middleware, "/admin/login")
+
+        assert calls == ["/admin/login"]
+        assert messages[0]["status"] == 200
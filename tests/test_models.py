@@ -16,10 +16,13 @@ import uuid
 from datetime import datetime, timedelta, timezone
 
 import pytest
-from sqlalchemy import select
+from sqlalchemy import delete, insert, select
+from sqlalchemy.exc import InvalidRequestError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, raiseload, selectinload
 
-from learn_fastapi_auth.models import RefreshToken, Token, User, UserData
+from learn_fastapi_auth.database import Base
+from learn_fastapi_auth.models import RefreshToken, Token, User, UserData, hash_token
 
 
 # ------------------------------------------------------------------------------
@@ -32,7 +35,13 @@ def user_id() -> uuid.UUID:
 
 
 @pytest.fixture
-def make_user():
+def now_utc() -> datetime:
+    """Current UTC time, read once per test for the factories' defaults."""
+    return datetime.now(timezone.utc)
+
+
+@pytest.fixture
+def make_user(uniq):
     """Factory fixture to create User instances."""
 
     def _make_user(
@@ -46,7 +55,7 @@ def make_user():
     ) -> User:
         return User(
             id=user_id or uuid.uuid4(),
-            email=email or f"user_{uuid.uuid4().hex[:8]}@example.com",
+            email=email or f"user_{uniq()}@example.com",
             hashed_password=hashed_password,
             is_active=is_active,
             is_superuser=is_superuser,
@@ -74,41 +83,161 @@ def make_user_data():
 
 
 @pytest.fixture
-def make_token():
-    """Factory fixture to create Token instances."""
+def make_token_row(uniq, now_utc):
+    """
+    Factory fixture to create Token column dicts, for bulk
+    ``insert(Token)`` when the test does not need the ORM objects.
+    """
 
-    def _make_token(
+    def _make_token_row(
         user_id: uuid.UUID,
         token: str | None = None,
         expires_at: datetime | None = None,
-    ) -> Token:
-        return Token(
-            token=token or f"access_token_{uuid.uuid4().hex}",
+    ) -> dict:
+        return dict(
+            token_hash=hash_token(token or f"access_token_{uniq()}"),
             user_id=user_id,
-            expires_at=expires_at or datetime.now(timezone.utc) + timedelta(hours=1),
+            expires_at=expires_at or now_utc + timedelta(hours=1),
         )
 
+    return _make_token_row
+
+
+@pytest.fixture
+def make_token(make_token_row):
+    """Factory fixture to create Token instances."""
+
+    def _make_token(user_id: uuid.UUID, **kwargs) -> Token:
+        return Token(**make_token_row(user_id, **kwargs))
+
     return _make_token
 
 
 @pytest.fixture
-def make_refresh_token():
-    """Factory fixture to create RefreshToken instances."""
+def make_refresh_token_row(uniq, now_utc):
+    """
+    Factory fixture to create RefreshToken column dicts, for bulk
+    ``insert(RefreshToken)`` when the test does not need the ORM objects.
+    """
 
-    def _make_refresh_token(
+    def _make_refresh_token_row(
         user_id: uuid.UUID,
         token: str | None = None,
-        expires_at: datetime | None = None,
-    ) -> RefreshToken:
-        return RefreshToken(
-            token=token or f"refresh_token_{uuid.uuid4().hex}",
+        expires_at: int | None = None,
+    ) -> dict:
+        return dict(
+            token_hash=hash_token(token or f"refresh_token_{uniq()}"),
             user_id=user_id,
-            expires_at=expires_at or datetime.now(timezone.utc) + timedelta(days=7),
+            expires_at=expires_at or int(now_utc.timestamp()) + 7 * 24 * 3600,
         )
 
+    return _make_refresh_token_row
+
+
+@pytest.fixture
+def make_refresh_token(make_refresh_token_row):
+    """Factory fixture to create RefreshToken instances."""
+
+    def _make_refresh_token(user_id: uuid.UUID, **kwargs) -> RefreshToken:
+        return RefreshToken(**make_refresh_token_row(user_id, **kwargs))
+
     return _make_refresh_token
 
 
+async def load_users(
+    session: AsyncSession,
+    user_ids: list[uuid.UUID],
+    *relationships: str,
+) -> dict[uuid.UUID, User]:
+    """
+    Reload users with the given relationships in one batched query each,
+    instead of one ``session.refresh(user, [...])`` per user.
+
+    Every other relationship is set to ``raiseload``, so a test touching a
+    relationship it did not ask for fails instead of lazy loading.
+    """
+    stmt = (
+        select(User)
+        .where(User.id.in_(user_ids))
+        .options(
+            *[selectinload(getattr(User, name)) for name in relationships],
+            raiseload("*"),
+        )
+        .execution_options(populate_existing=True)
+    )
+    result = await session.execute(stmt)
+    return {user.id: user for user in result.unique().scalars()}
+
+
+async def load_user(
+    session: AsyncSession,
+    user_id: uuid.UUID,
+    *relationships: str,
+) -> User:
+    """Reload one user with the given relationships; see :func:`load_users`."""
+    users = await load_users(session, [user_id], *relationships)
+    return users[user_id]
+
+
+# ------------------------------------------------------------------------------
+# Token Hashing Tests
+# ------------------------------------------------------------------------------
+class TestHashToken:
+    """Tests for hash_token function."""
+
+    def test_returns_fixed_size_digest(self):
+        """Test that the digest is always 32 bytes, whatever the token length."""
+        assert len(hash_token("short")) == 32
+        assert len(hash_token("x" * 800)) == 32
+
+    def test_is_deterministic(self):
+        """Test that the same token always maps to the same key."""
+        assert hash_token("token_abc") == hash_token("token_abc")
+        assert hash_token("token_abc") != hash_token("token_abd")
+
+
+# ------------------------------------------------------------------------------
+# Registry Tests
+# ------------------------------------------------------------------------------
+class TestModelRegistry:
+    """Tests that every table is mapped by exactly one class."""
+
+    def test_one_mapper_per_table(self):
+        """Test that no table is mapped twice in the declarative registry."""
+        tables = [mapper.local_table.name for mapper in Base.registry.mappers]
+        assert sorted(tables) == sorted(set(tables))
+        assert set(tables) == set(Base.metadata.tables)
+        assert set(tables) == {
+            User.__tablename__,
+            UserData.__tablename__,
+            Token.__tablename__,
+            RefreshToken.__tablename__,
+        }
+
+
+# ------------------------------------------------------------------------------
+# Index Tests
+# ------------------------------------------------------------------------------
+class TestTokenIndexes:
+    """Tests for the revocation and cleanup indexes on token tables."""
+
+    @pytest.mark.parametrize("model", [Token, RefreshToken])
+    def test_user_expires_composite_index(self, model):
+        """Test that user_id leads the composite index, followed by expires_at."""
+        columns = [
+            [c.name for c in index.columns] for index in model.__table__.indexes
+        ]
+        assert ["user_id", "expires_at"] in columns
+
+    @pytest.mark.parametrize("model", [Token, RefreshToken])
+    def test_expires_index(self, model):
+        """Test that expires_at has its own index for the expired cleanup."""
+        columns = [
+            [c.name for c in index.columns] for index in model.__table__.indexes
+        ]
+        assert ["expires_at"] in columns
+
+
 # ------------------------------------------------------------------------------
 # User ↔ UserData One-to-One Relationship Tests
 # ------------------------------------------------------------------------------
@@ -124,14 +253,13 @@ class TestUserUserDataRelationship:
         """Test that a User can have associated UserData."""
         user = make_user()
         test_session.add(user)
-        await test_session.flush()
 
         user_data = make_user_data(user_id=user.id, text_value="My personal notes")
         test_session.add(user_data)
         await test_session.commit()
 
         # Refresh to load relationships
-        await test_session.refresh(user, ["user_data"])
+        user = await load_user(test_session, user.id, "user_data")
 
         assert user.user_data is not None
         assert user.user_data.text_value == "My personal notes"
@@ -146,7 +274,6 @@ class TestUserUserDataRelationship:
         """Test that UserData.user back-populates correctly."""
         user = make_user(email="backpop@example.com")
         test_session.add(user)
-        await test_session.flush()
 
         user_data = make_user_data(user_id=user.id)
         test_session.add(user_data)
@@ -159,6 +286,29 @@ class TestUserUserDataRelationship:
         assert user_data.user.email == "backpop@example.com"
         assert user_data.user.id == user.id
 
+    async def test_user_data_is_eager_loaded(
+        self,
+        test_session: AsyncSession,
+        make_user,
+        make_user_data,
+    ):
+        """Test that ``joinedload`` loads UserData in the same query."""
+        user = make_user()
+        test_session.add(user)
+        test_session.add(make_user_data(user_id=user.id, text_value="Joined"))
+        await test_session.commit()
+        test_session.expunge_all()
+
+        result = await test_session.execute(
+            select(User)
+            .where(User.id == user.id)
+            .options(joinedload(User.user_data))
+        )
+        queried_user = result.unique().scalar_one()
+
+        # An async lazy load would raise MissingGreenlet here
+        assert queried_user.user_data.text_value == "Joined"
+
     async def test_user_without_user_data(
         self,
         test_session: AsyncSession,
@@ -169,7 +319,7 @@ class TestUserUserDataRelationship:
         test_session.add(user)
         await test_session.commit()
 
-        await test_session.refresh(user, ["user_data"])
+        user = await load_user(test_session, user.id, "user_data")
 
         assert user.user_data is None
 
@@ -184,22 +334,20 @@ class TestUserTokenRelationship:
         self,
         test_session: AsyncSession,
         make_user,
-        make_token,
+        make_token_row,
     ):
         """Test that a User can have multiple access tokens."""
         user = make_user()
         test_session.add(user)
-        await test_session.flush()
 
         # Create 3 tokens for the same user
-        tokens = [
-            make_token(user_id=user.id, token=f"token_{i}_{uuid.uuid4().hex}")
-            for i in range(3)
-        ]
-        test_session.add_all(tokens)
+        await test_session.execute(
+            insert(Token),
+            [make_token_row(user_id=user.id, token=f"token_{i}") for i in range(3)],
+        )
         await test_session.commit()
 
-        await test_session.refresh(user, ["tokens"])
+        user = await load_user(test_session, user.id, "tokens")
 
         assert len(user.tokens) == 3
         assert all(t.user_id == user.id for t in user.tokens)
@@ -213,7 +361,6 @@ class TestUserTokenRelationship:
         """Test that Token.user back-populates correctly."""
         user = make_user(email="token_owner@example.com")
         test_session.add(user)
-        await test_session.flush()
 
         token = make_token(user_id=user.id)
         test_session.add(token)
@@ -234,7 +381,7 @@ class TestUserTokenRelationship:
         test_session.add(user)
         await test_session.commit()
 
-        await test_session.refresh(user, ["tokens"])
+        user = await load_user(test_session, user.id, "tokens")
 
         assert user.tokens == []
 
@@ -249,24 +396,23 @@ class TestUserRefreshTokenRelationship:
         self,
         test_session: AsyncSession,
         make_user,
-        make_refresh_token,
+        make_refresh_token_row,
     ):
         """Test that a User can have multiple refresh tokens (multiple devices)."""
         user = make_user()
         test_session.add(user)
-        await test_session.flush()
 
         # Create refresh tokens for different devices
-        refresh_tokens = [
-            make_refresh_token(
-                user_id=user.id, token=f"refresh_{device}_{uuid.uuid4().hex}"
-            )
-            for device in ["desktop", "mobile", "tablet"]
-        ]
-        test_session.add_all(refresh_tokens)
+        await test_session.execute(
+            insert(RefreshToken),
+            [
+                make_refresh_token_row(user_id=user.id, token=f"refresh_{device}")
+                for device in ["desktop", "mobile", "tablet"]
+            ],
+        )
         await test_session.commit()
 
-        await test_session.refresh(user, ["refresh_tokens"])
+        user = await load_user(test_session, user.id, "refresh_tokens")
 
         assert len(user.refresh_tokens) == 3
         assert all(rt.user_id == user.id for rt in user.refresh_tokens)
@@ -280,7 +426,6 @@ class TestUserRefreshTokenRelationship:
         """Test that RefreshToken.user back-populates correctly."""
         user = make_user(email="refresh_owner@example.com")
         test_session.add(user)
-        await test_session.flush()
 
         refresh_token = make_refresh_token(user_id=user.id)
         test_session.add(refresh_token)
@@ -307,7 +452,6 @@ class TestCascadeDelete:
         """Test that deleting a User cascades to delete UserData."""
         user = make_user()
         test_session.add(user)
-        await test_session.flush()
 
         user_data = make_user_data(user_id=user.id, text_value="Will be deleted")
         test_session.add(user_data)
@@ -315,8 +459,8 @@ class TestCascadeDelete:
 
         user_id = user.id
 
-        # Delete the user
-        await test_session.delete(user)
+        # Delete the user with one Core DELETE; the database cascades
+        await test_session.execute(delete(User).where(User.id == user_id))
         await test_session.commit()
 
         # Verify UserData is also deleted
@@ -329,83 +473,86 @@ class TestCascadeDelete:
         self,
         test_session: AsyncSession,
         make_user,
-        make_token,
+        make_token_row,
     ):
         """Test that deleting a User cascades to delete all Tokens."""
         user = make_user()
         test_session.add(user)
-        await test_session.flush()
 
-        tokens = [make_token(user_id=user.id) for _ in range(3)]
-        test_session.add_all(tokens)
+        await test_session.execute(
+            insert(Token), [make_token_row(user_id=user.id) for _ in range(3)]
+        )
         await test_session.commit()
 
         user_id = user.id
-        token_values = [t.token for t in tokens]
 
-        # Delete the user
-        await test_session.delete(user)
+        # Delete the user with one Core DELETE; the database cascades
+        await test_session.execute(delete(User).where(User.id == user_id))
         await test_session.commit()
 
         # Verify all Tokens are deleted
         result = await test_session.execute(
-            select(Token).where(Token.user_id == user_id)
+            select(Token.token_hash).where(Token.user_id == user_id).limit(1)
         )
-        assert result.scalars().all() == []
+        assert result.first() is None
 
     async def test_deleting_user_deletes_refresh_tokens(
         self,
         test_session: AsyncSession,
         make_user,
-        make_refresh_token,
+        make_refresh_token_row,
     ):
         """Test that deleting a User cascades to delete all RefreshTokens."""
         user = make_user()
         test_session.add(user)
-        await test_session.flush()
 
-        refresh_tokens = [make_refresh_token(user_id=user.id) for _ in range(2)]
-        test_session.add_all(refresh_tokens)
+        await test_session.execute(
+            insert(RefreshToken),
+            [make_refresh_token_row(user_id=user.id) for _ in range(2)],
+        )
         await test_session.commit()
 
         user_id = user.id
 
-        # Delete the user
-        await test_session.delete(user)
+        # Delete the user with one Core DELETE; the database cascades
+        await test_session.execute(delete(User).where(User.id == user_id))
         await test_session.commit()
 
         # Verify all RefreshTokens are deleted
         result = await test_session.execute(
-            select(RefreshToken).where(RefreshToken.user_id == user_id)
+            select(RefreshToken.token_hash)
+            .where(RefreshToken.user_id == user_id)
+            .limit(1)
         )
-        assert result.scalars().all() == []
+        assert result.first() is None
 
     async def test_deleting_user_cascades_all_related_data(
         self,
         test_session: AsyncSession,
         make_user,
         make_user_data,
-        make_token,
-        make_refresh_token,
+        make_token_row,
+        make_refresh_token_row,
     ):
         """Test that deleting a User cascades to delete ALL related data."""
         user = make_user()
         test_session.add(user)
-        await test_session.flush()
 
         # Create all related entities
-        user_data = make_user_data(user_id=user.id)
-        tokens = [make_token(user_id=user.id) for _ in range(2)]
-        refresh_tokens = [make_refresh_token(user_id=user.id) for _ in range(2)]
-
-        test_session.add(user_data)
-        test_session.add_all(tokens)
-        test_session.add_all(refresh_tokens)
+        test_session.add(make_user_data(user_id=user.id))
+        await test_session.execute(
+            insert(Token), [make_token_row(user_id=user.id) for _ in range(2)]
+        )
+        await test_session.execute(
+            insert(RefreshToken),
+            [make_refresh_token_row(user_id=user.id) for _ in range(2)],
+        )
         await test_session.commit()
 
         user_id = user.id
 
-        # Delete the user
+        # Delete the user through the ORM, as fastapi-users does; with
+        # passive_deletes this is still a single DELETE
         await test_session.delete(user)
         await test_session.commit()
 
@@ -414,15 +561,17 @@ class TestCascadeDelete:
             select(UserData).where(UserData.user_id == user_id)
         )
         token_result = await test_session.execute(
-            select(Token).where(Token.user_id == user_id)
+            select(Token.token_hash).where(Token.user_id == user_id).limit(1)
         )
         refresh_token_result = await test_session.execute(
-            select(RefreshToken).where(RefreshToken.user_id == user_id)
+            select(RefreshToken.token_hash)
+            .where(RefreshToken.user_id == user_id)
+            .limit(1)
         )
 
         assert user_data_result.scalar_one_or_none() is None
-        assert token_result.scalars().all() == []
-        assert refresh_token_result.scalars().all() == []
+        assert token_result.first() is None
+        assert refresh_token_result.first() is None
 
 
 # ------------------------------------------------------------------------------
@@ -442,7 +591,6 @@ class TestRelationshipEdgeCases:
         user1 = make_user(email="user1@example.com")
         user2 = make_user(email="user2@example.com")
         test_session.add_all([user1, user2])
-        await test_session.flush()
 
         # Create data for both users
         user_data1 = make_user_data(user_id=user1.id, text_value="User 1 data")
@@ -453,16 +601,34 @@ class TestRelationshipEdgeCases:
         test_session.add_all([user_data1, user_data2, token1, token2])
         await test_session.commit()
 
-        # Refresh relationships
-        await test_session.refresh(user1, ["user_data", "tokens"])
-        await test_session.refresh(user2, ["user_data", "tokens"])
+        # Load both users and their relationships in one round
+        users = await load_users(
+            test_session, [user1.id, user2.id], "user_data", "tokens"
+        )
+        user1, user2 = users[user1.id], users[user2.id]
 
         # Verify independence
         assert user1.user_data.text_value == "User 1 data"
         assert user2.user_data.text_value == "User 2 data"
         assert len(user1.tokens) == 1
         assert len(user2.tokens) == 1
-        assert user1.tokens[0].token != user2.tokens[0].token
+        assert user1.tokens[0].token_hash != user2.tokens[0].token_hash
+
+    async def test_load_user_raises_on_unrequested_relationship(
+        self,
+        test_session: AsyncSession,
+        make_user,
+    ):
+        """Test that load_user blocks lazy loads of relationships not asked for."""
+        user = make_user()
+        test_session.add(user)
+        await test_session.commit()
+
+        user = await load_user(test_session, user.id, "tokens")
+
+        assert user.tokens == []
+        with pytest.raises(InvalidRequestError):
+            user.refresh_tokens
 
     async def test_user_with_firebase_uid(
         self,
@@ -10,15 +10,25 @@ Tests cover:
 - middleware path matching
 """
 
-from unittest.mock import MagicMock
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
 
 import pytest
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from httpx import ASGITransport, AsyncClient
 from starlette.datastructures import Headers
 
 from learn_fastapi_auth.ratelimit import (
     PathRateLimitExceeded,
+    PathRateLimitMiddleware,
+    TokenBucketStore,
+    _parse_limit,
     check_path_rate_limit,
     get_client_ip,
+    pack_ip,
+    path_rate_limit_exceeded_handler,
     reset_rate_limit_storage,
 )
 
@@ -26,10 +36,12 @@ from learn_fastapi_auth.ratelimit import (
 class MockRequest:
     """Mock request object for testing."""
 
+    # Most tests pass no headers; share one (read-only) instance
+    _EMPTY_HEADERS = Headers({})
+
     def __init__(self, headers: dict = None, client_host: str = "127.0.0.1"):
-        self.headers = Headers(headers or {})
-        self.client = MagicMock()
-        self.client.host = client_host
+        self.headers = Headers(headers) if headers else self._EMPTY_HEADERS
+        self.client = SimpleNamespace(host=client_host)
 
 
 class TestGetClientIP:
@@ -71,11 +83,33 @@ class TestGetClientIP:
         assert ip == "10.0.0.1"
 
 
+class TestPackIP:
+    """Test pack_ip function."""
+
+    def test_ipv4_is_mapped_to_ipv6(self):
+        """Test that IPv4 and its IPv4-mapped IPv6 form pack identically."""
+        packed = pack_ip("192.168.1.1")
+        assert len(packed) == 16
+        assert packed == pack_ip("::ffff:192.168.1.1")
+
+    def test_ipv6(self):
+        """Test that equivalent IPv6 spellings pack identically."""
+        assert pack_ip("2001:db8::1") == pack_ip("2001:0db8:0:0:0:0:0:1")
+
+    def test_invalid_falls_back_to_bytes(self):
+        """Test that non-IP values are kept as UTF-8 bytes."""
+        assert pack_ip("testclient") == b"testclient"
+
+
 class TestCheckPathRateLimit:
     """Test check_path_rate_limit function."""
 
-    def setup_method(self):
-        """Reset rate limit storage before each test."""
+    @pytest.fixture(autouse=True, scope="class")
+    def reset_limiter(self):
+        """
+        Reset rate limit storage once for the class; every test uses its own
+        client IP, so their counters never collide.
+        """
         reset_rate_limit_storage()
 
     def test_within_limit(self):
@@ -101,38 +135,70 @@ class TestCheckPathRateLimit:
 
         assert exc_info.value.limit_string == "5/minute"
 
-    def test_different_ips_have_separate_limits(self):
-        """Test that different IPs have separate rate limit counters."""
-        request1 = MockRequest(client_host="10.0.0.3")
-        request2 = MockRequest(client_host="10.0.0.4")
+    @pytest.mark.parametrize(
+        "host, other_host, other_path",
+        [
+            ("10.0.0.3", "10.0.0.4", "/api/test"),  # different IP, same path
+            ("10.0.0.5", "10.0.0.5", "/api/other"),  # same IP, different path
+        ],
+    )
+    def test_separate_limits(self, host: str, other_host: str, other_path: str):
+        """Test that each (IP, path) pair has its own rate limit counter."""
+        request = MockRequest(client_host=host)
 
-        # Exhaust limit for request1
+        # Exhaust limit for host on /api/test
         for _ in range(5):
-            check_path_rate_limit(request1, "5/minute", "/api/test")
+            check_path_rate_limit(request, "5/minute", "/api/test")
 
-        # request1 should now be blocked
+        # That pair should now be blocked
         with pytest.raises(PathRateLimitExceeded):
-            check_path_rate_limit(request1, "5/minute", "/api/test")
+            check_path_rate_limit(request, "5/minute", "/api/test")
 
-        # request2 should still work (different IP)
-        result = check_path_rate_limit(request2, "5/minute", "/api/test")
+        # Any other pair should still work
+        other = MockRequest(client_host=other_host)
+        result = check_path_rate_limit(other, "5/minute", other_path)
         assert result is True
 
-    def test_different_paths_have_separate_limits(self):
-        """Test that different paths have separate rate limit counters."""
-        request = MockRequest(client_host="10.0.0.5")
 
-        # Exhaust limit for /api/login
-        for _ in range(5):
-            check_path_rate_limit(request, "5/minute", "/api/login")
-
-        # /api/login should now be blocked
-        with pytest.raises(PathRateLimitExceeded):
-            check_path_rate_limit(request, "5/minute", "/api/login")
-
-        # /api/register should still work (different path)
-        result = check_path_rate_limit(request, "5/minute", "/api/register")
-        assert result is True
+class TestTokenBucketStore:
+    """Test the token bucket storage."""
+
+    def test_refill(self):
+        """Test that a drained bucket refills at amount / expiry per second."""
+        store = TokenBucketStore()
+        now = time.monotonic()
+        with patch("learn_fastapi_auth.ratelimit.time.monotonic", return_value=now):
+            assert store.acquire_entry(b"k", 2, 60) is True
+            assert store.acquire_entry(b"k", 2, 60) is True
+            assert store.acquire_entry(b"k", 2, 60) is False
+        # One token comes back after 30 seconds
+        with patch(
+            "learn_fastapi_auth.ratelimit.time.monotonic", return_value=now + 30
+        ):
+            assert store.acquire_entry(b"k", 2, 60) is True
+            assert store.acquire_entry(b"k", 2, 60) is False
+
+    def test_idle_buckets_are_swept(self):
+        """Test that buckets idle longer than the longest expiry are dropped."""
+        store = TokenBucketStore()
+        now = time.monotonic()
+        with patch("learn_fastapi_auth.ratelimit.time.monotonic", return_value=now):
+            store.acquire_entry(b"idle", 5, 60)
+        assert len(store) == 1
+        with patch(
+            "learn_fastapi_auth.ratelimit.time.monotonic", return_value=now + 61
+        ):
+            store.acquire_entry(b"active", 5, 60)
+        assert len(store) == 1
+
+
+class TestParseLimit:
+    """Test the cached limit string parser."""
+
+    def test_parse_limit(self):
+        """Test that limit strings parse into amount and expiry seconds."""
+        assert _parse_limit("5/minute") == (5, 60)
+        assert _parse_limit("10/hour") == (10, 3600)
 
 
 class TestPathRateLimitExceeded:
@@ -154,6 +220,26 @@ class TestPathRateLimitExceeded:
             pytest.fail("Should have caught PathRateLimitExceeded")
 
 
+class TestPathRateLimitExceededHandler:
+    """Test the pre-encoded 429 response."""
+
+    async def test_body_matches_json_response(self):
+        """Test the cached body is byte-identical to a JSONResponse."""
+        response = await path_rate_limit_exceeded_handler(
+            MockRequest(), PathRateLimitExceeded("5/minute")
+        )
+        expected = JSONResponse(
+            content={
+                "detail": "RATE_LIMIT_EXCEEDED",
+                "message": "Too many requests. Limit: 5/minute",
+            },
+        )
+
+        assert response.status_code == 429
+        assert response.body == expected.body
+        assert response.headers["content-type"] == "application/json"
+
+
 class TestResetRateLimitStorage:
     """Test reset_rate_limit_storage function."""
 
@@ -177,6 +263,71 @@ class TestResetRateLimitStorage:
         assert result is True
 
 
+class TestPathRateLimitMiddleware:
+    """Test the pure ASGI path rate limit middleware."""
+
+    def setup_method(self):
+        """Reset rate limit storage before each test."""
+        reset_rate_limit_storage()
+
+    @pytest.fixture
+    def app(self) -> FastAPI:
+        app = FastAPI()
+
+        @app.get("/limited")
+        async def limited():
+            return {"ok": True}
+
+        @app.get("/limited/strict")
+        async def limited_strict():
+            return {"ok": True}
+
+        @app.get("/open")
+        async def open_():
+            return {"ok": True}
+
+        app.add_middleware(
+            PathRateLimitMiddleware,
+            path_limits={"/limited": "2/minute", "/limited/strict": "1/minute"},
+        )
+        return app
+
+    async def test_returns_429_when_exceeded(self, app: FastAPI):
+        """Test that requests over the limit get a 429 JSON response."""
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as ac:
+            assert (await ac.get("/limited")).status_code == 200
+            assert (await ac.get("/limited")).status_code == 200
+            response = await ac.get("/limited")
+
+        assert response.status_code == 429
+        assert response.json()["detail"] == "RATE_LIMIT_EXCEEDED"
+
+    async def test_longest_prefix_wins(self, app: FastAPI):
+        """Test that the most specific path prefix rule is applied."""
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as ac:
+            assert (await ac.get("/limited/strict")).status_code == 200
+            assert (await ac.get("/limited/strict")).status_code == 429
+
+    async def test_unmatched_path_not_limited(self, app: FastAPI):
+        """Test that paths without a rule are passed through."""
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as ac:
+            for _ in range(5):
+                assert (await ac.get("/open")).status_code == 200
+
+    def test_first_segment_filter(self):
+        """Test the first-segment filter is only built for whole segments."""
+        middleware = PathRateLimitMiddleware(
+            None, {"/api/auth/login": "5/minute", "/api/auth/register": "5/minute"}
+        )
+        assert middleware.first_segments == {"/api"}
+
+        middleware = PathRateLimitMiddleware(None, {"/limited": "2/minute"})
+        assert middleware.first_segments is None
+
+
 if __name__ == "__main__":
     from learn_fastapi_auth.tests import run_cov_test
 
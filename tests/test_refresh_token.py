@@ -7,121 +7,170 @@ Tests the function interfaces of the refresh token module.
 Integration tests (actual HTTP requests with token refresh) should be done manually.
 """
 
+import re
+import time
 import uuid
-from datetime import datetime, timedelta, timezone
-from unittest.mock import AsyncMock, MagicMock, patch
+from dataclasses import dataclass
+from typing import Optional
+from unittest.mock import AsyncMock, patch
 
 import pytest
 
 from learn_fastapi_auth.refresh_token import (
     generate_refresh_token,
+    generate_refresh_tokens,
     create_refresh_token,
+    valid_refresh_tokens,
     validate_refresh_token,
+    validate_and_load_user,
     revoke_refresh_token,
     revoke_all_user_refresh_tokens,
     cleanup_expired_tokens,
     get_refresh_token_cookie_settings,
 )
+from learn_fastapi_auth.models import RefreshToken, User, hash_token
 from learn_fastapi_auth.one.api import one
 
+_URLSAFE = re.compile(r"[A-Za-z0-9_-]+")
+
+#: Fixed ``time.time()`` for tests that check computed expiry timestamps
+FROZEN_TIME = 1_750_000_000
+
+
+@dataclass(slots=True)
+class StubResult:
+    """Stand-in for a SQLAlchemy ``Result`` of a one-row SELECT or a DELETE."""
+
+    row: Optional[tuple] = None
+    rowcount: int = 0
+
+    def one_or_none(self) -> Optional[tuple]:
+        return self.row
+
+
+def _added(mock_session: AsyncMock) -> RefreshToken:
+    """Return the object passed to the last ``mock_session.add`` call."""
+    return mock_session.add.call_args.args[0]
+
+
+@pytest.fixture(scope="module")
+def user_id() -> uuid.UUID:
+    """
+    One user ID for the mock-session tests; none of them touch a real
+    database, so they do not need distinct IDs.
+    """
+    return uuid.uuid4()
+
+
+@pytest.fixture(scope="module")
+def shared_mock_session() -> AsyncMock:
+    """One ``AsyncMock`` session built per module; see :func:`mock_session`."""
+    return AsyncMock()
+
+
+@pytest.fixture
+def mock_session(shared_mock_session: AsyncMock) -> AsyncMock:
+    """
+    Stand-in for an ``AsyncSession`` whose calls the test asserts on.
+
+    The module's single mock is reset after each test, including the return
+    values and side effects set on it and its children.
+    """
+    yield shared_mock_session
+    shared_mock_session.reset_mock(return_value=True, side_effect=True)
+
 
 class TestGenerateRefreshToken:
     """Tests for generate_refresh_token function."""
 
-    def test_generates_string(self):
-        """Test that function returns a string."""
+    def test_generates_url_safe_string(self):
+        """Test that the token is a 64-char URL-safe string (48 random bytes)."""
         token = generate_refresh_token()
         assert isinstance(token, str)
-
-    def test_generates_correct_length(self):
-        """Test that token has appropriate length (64 chars from 48 bytes)."""
-        token = generate_refresh_token()
         assert len(token) == 64
+        # URL-safe base64 only contains alphanumeric, - and _
+        assert _URLSAFE.fullmatch(token) is not None
 
     def test_generates_unique_tokens(self):
         """Test that each call generates a unique token."""
-        tokens = [generate_refresh_token() for _ in range(100)]
         # All tokens should be unique
-        assert len(set(tokens)) == 100
+        assert len({generate_refresh_token() for _ in range(100)}) == 100
 
-    def test_generates_url_safe_token(self):
-        """Test that token is URL-safe (no special characters)."""
-        token = generate_refresh_token()
-        # URL-safe base64 only contains alphanumeric, - and _
-        assert all(c.isalnum() or c in "-_" for c in token)
+    def test_batch_generates_unique_url_safe_tokens(self):
+        """Test that a batch has n unique tokens shaped like single ones."""
+        tokens = generate_refresh_tokens(1000)
+
+        assert len(set(tokens)) == 1000
+        assert all(len(t) == 64 and _URLSAFE.fullmatch(t) for t in tokens)
+        assert generate_refresh_tokens(0) == []
 
 
 class TestCreateRefreshToken:
     """Tests for create_refresh_token function."""
 
-    @pytest.mark.asyncio
-    async def test_creates_and_stores_token(self):
+    async def test_creates_and_stores_token(
+        self, mock_session: AsyncMock, user_id: uuid.UUID
+    ):
         """Test that function creates a token and stores it in database."""
-        mock_session = AsyncMock()
-        user_id = uuid.uuid4()
-
         token = await create_refresh_token(mock_session, user_id)
 
         assert isinstance(token, str)
         assert len(token) == 64
         # Verify session.add was called with a RefreshToken
         mock_session.add.assert_called_once()
-        mock_session.commit.assert_called_once()
 
-    @pytest.mark.asyncio
-    async def test_creates_token_with_default_lifetime(self):
-        """Test that function creates token with default lifetime when not specified."""
-        from learn_fastapi_auth.models import RefreshToken
+    async def test_stores_digest_not_raw_token(
+        self, mock_session: AsyncMock, user_id: uuid.UUID
+    ):
+        """Test that only the SHA-256 digest of the token reaches the DB."""
+        token = await create_refresh_token(mock_session, user_id)
 
-        mock_session = AsyncMock()
-        user_id = uuid.uuid4()
+        stored = _added(mock_session)
+        assert stored.token_hash == hash_token(token)
+        assert len(stored.token_hash) == 32
+        assert token.encode() not in stored.token_hash
 
-        await create_refresh_token(mock_session, user_id)
+    async def test_creates_token_with_default_lifetime(
+        self, mock_session: AsyncMock, user_id: uuid.UUID
+    ):
+        """Test that function creates token with default lifetime when not specified."""
+        with patch(
+            "learn_fastapi_auth.refresh_token.time.time", return_value=FROZEN_TIME
+        ):
+            await create_refresh_token(mock_session, user_id)
 
-        # Get the RefreshToken object passed to session.add
-        call_args = mock_session.add.call_args
-        refresh_token = call_args[0][0]
+        refresh_token = _added(mock_session)
 
         # Verify it's a RefreshToken and has correct lifetime
-        assert isinstance(refresh_token, RefreshToken)
-        expected_expires = datetime.now(timezone.utc) + timedelta(
-            seconds=one.env.refresh_token_lifetime
-        )
-        # Allow 5 seconds tolerance for test execution time
-        assert abs((refresh_token.expires_at - expected_expires).total_seconds()) < 5
+        assert type(refresh_token) is RefreshToken
+        assert refresh_token.expires_at == FROZEN_TIME + one.env.refresh_token_lifetime
 
-    @pytest.mark.asyncio
-    async def test_creates_token_with_custom_lifetime(self):
+    async def test_creates_token_with_custom_lifetime(
+        self, mock_session: AsyncMock, user_id: uuid.UUID
+    ):
         """Test that function creates token with custom lifetime (Remember Me)."""
-        from learn_fastapi_auth.models import RefreshToken
-
-        mock_session = AsyncMock()
-        user_id = uuid.uuid4()
         custom_lifetime = 2592000  # 30 days in seconds
 
-        await create_refresh_token(mock_session, user_id, lifetime_seconds=custom_lifetime)
+        with patch(
+            "learn_fastapi_auth.refresh_token.time.time", return_value=FROZEN_TIME
+        ):
+            await create_refresh_token(
+                mock_session, user_id, lifetime_seconds=custom_lifetime
+            )
 
-        # Get the RefreshToken object passed to session.add
-        call_args = mock_session.add.call_args
-        refresh_token = call_args[0][0]
+        refresh_token = _added(mock_session)
 
         # Verify it's a RefreshToken and has correct custom lifetime
-        assert isinstance(refresh_token, RefreshToken)
-        expected_expires = datetime.now(timezone.utc) + timedelta(seconds=custom_lifetime)
-        # Allow 5 seconds tolerance for test execution time
-        assert abs((refresh_token.expires_at - expected_expires).total_seconds()) < 5
+        assert type(refresh_token) is RefreshToken
+        assert refresh_token.expires_at == FROZEN_TIME + custom_lifetime
 
-    @pytest.mark.asyncio
-    async def test_remember_me_token_longer_than_default(self):
+    async def test_remember_me_token_longer_than_default(
+        self, mock_session: AsyncMock, user_id: uuid.UUID
+    ):
         """Test that Remember Me token has longer lifetime than default."""
-        from learn_fastapi_auth.models import RefreshToken
-
-        mock_session = AsyncMock()
-        user_id = uuid.uuid4()
-
         # Create default token
         await create_refresh_token(mock_session, user_id)
-        default_token = mock_session.add.call_args[0][0]
+        default_token = _added(mock_session)
 
         # Reset mock
         mock_session.reset_mock()
@@ -131,7 +180,7 @@ class TestCreateRefreshToken:
             mock_session, user_id,
             lifetime_seconds=one.env.remember_me_refresh_token_lifetime
         )
-        remember_me_token = mock_session.add.call_args[0][0]
+        remember_me_token = _added(mock_session)
 
         # Remember me token should expire later than default
         assert remember_me_token.expires_at > default_token.expires_at
@@ -140,162 +189,247 @@ class TestCreateRefreshToken:
 class TestValidateRefreshToken:
     """Tests for validate_refresh_token function."""
 
-    @pytest.mark.asyncio
-    async def test_returns_user_id_for_valid_token(self):
-        """Test that valid token returns user ID."""
-        mock_session = AsyncMock()
-        user_id = uuid.uuid4()
+    def setup_method(self):
+        valid_refresh_tokens.clear()
 
-        # Create mock refresh token
-        mock_token = MagicMock()
-        mock_token.user_id = user_id
-        mock_token.expires_at = datetime.now(timezone.utc) + timedelta(hours=1)
+    async def test_returns_user_id_for_valid_token(
+        self, mock_session: AsyncMock, user_id: uuid.UUID
+    ):
+        """Test that valid token returns user ID."""
+        # Mock the (user_id, expires_at) row
+        expires_at = int(time.time()) + 3600
 
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = mock_token
+        mock_result = StubResult((user_id, expires_at))
         mock_session.execute.return_value = mock_result
 
         result = await validate_refresh_token(mock_session, "test_token")
 
         assert result == user_id
 
-    @pytest.mark.asyncio
-    async def test_returns_none_for_nonexistent_token(self):
+    async def test_returns_none_for_nonexistent_token(self, mock_session: AsyncMock):
         """Test that nonexistent token returns None."""
-        mock_session = AsyncMock()
-
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = None
+        mock_result = StubResult(None)
         mock_session.execute.return_value = mock_result
 
         result = await validate_refresh_token(mock_session, "nonexistent_token")
 
         assert result is None
 
-    @pytest.mark.asyncio
-    async def test_returns_none_for_expired_token(self):
-        """Test that expired token returns None and is deleted."""
-        mock_session = AsyncMock()
-        user_id = uuid.uuid4()
-
-        # Create mock expired token
-        mock_token = MagicMock()
-        mock_token.user_id = user_id
-        mock_token.expires_at = datetime.now(timezone.utc) - timedelta(hours=1)
+    async def test_returns_none_for_expired_token(
+        self, mock_session: AsyncMock, user_id: uuid.UUID
+    ):
+        """Test that expired token returns None without a per-request delete."""
+        # Mock an expired (user_id, expires_at) row
+        expires_at = int(time.time()) - 3600
 
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = mock_token
+        mock_result = StubResult((user_id, expires_at))
         mock_session.execute.return_value = mock_result
 
         result = await validate_refresh_token(mock_session, "expired_token")
 
         assert result is None
-        # Verify expired token was deleted
-        mock_session.delete.assert_called_once_with(mock_token)
-        mock_session.commit.assert_called_once()
+        # Expired rows are left to cleanup_expired_tokens()
+        mock_session.delete.assert_not_called()
+        mock_session.commit.assert_not_called()
+
+    async def test_valid_token_is_cached_until_revoked(
+        self, mock_session: AsyncMock, user_id: uuid.UUID
+    ):
+        """Test that a validated token skips the DB until it is revoked."""
+        expires_at = int(time.time()) + 3600
+
+        mock_result = StubResult((user_id, expires_at))
+        mock_session.execute.return_value = mock_result
+
+        assert await validate_refresh_token(mock_session, "cached_token") == user_id
+        assert await validate_refresh_token(mock_session, "cached_token") == user_id
+        assert mock_session.execute.call_count == 1
+
+        mock_result.rowcount = 1
+        await revoke_refresh_token(mock_session, "cached_token")
+        mock_result.row = None
+        assert await validate_refresh_token(mock_session, "cached_token") is None
+
+
+class TestValidateAndLoadUser:
+    """Tests for validate_and_load_user function."""
+
+    def setup_method(self):
+        valid_refresh_tokens.clear()
+
+    async def _make_user(self, session, is_active: bool = True) -> User:
+        user = User(
+            email=f"user_{uuid.uuid4().hex[:8]}@example.com",
+            hashed_password="hashed",
+            is_active=is_active,
+        )
+        session.add(user)
+        await session.commit()
+        return user
+
+    async def test_returns_user_for_valid_token(self, test_session):
+        """Test that a valid token loads its user in one query."""
+        user = await self._make_user(test_session)
+        token = await create_refresh_token(test_session, user.id)
+
+        loaded = await validate_and_load_user(test_session, token)
+
+        assert loaded is not None
+        assert loaded.id == user.id
+        assert valid_refresh_tokens.get(hash_token(token)) == user.id
+
+    async def test_returns_none_for_unknown_or_expired_token(self, test_session):
+        """Test that unknown and expired tokens return None."""
+        user = await self._make_user(test_session)
+        token = await create_refresh_token(test_session, user.id, lifetime_seconds=-1)
+
+        assert await validate_and_load_user(test_session, token) is None
+        assert await validate_and_load_user(test_session, "nonexistent") is None
+
+    async def test_returns_none_for_inactive_user(self, test_session):
+        """Test that a token of an inactive user returns None, even if cached."""
+        user = await self._make_user(test_session, is_active=False)
+        token = await create_refresh_token(test_session, user.id)
+
+        assert await validate_and_load_user(test_session, token) is None
+
+        valid_refresh_tokens.put(hash_token(token), user.id, 60)
+        assert await validate_and_load_user(test_session, token) is None
 
 
 class TestRevokeRefreshToken:
     """Tests for revoke_refresh_token function."""
 
-    @pytest.mark.asyncio
-    async def test_revokes_existing_token(self):
-        """Test that existing token is revoked and returns True."""
-        mock_session = AsyncMock()
-        mock_token = MagicMock()
-
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = mock_token
-        mock_session.execute.return_value = mock_result
+    async def test_revokes_existing_token(self, mock_session: AsyncMock):
+        """Test that existing token is revoked with one DELETE and returns True."""
+        mock_session.execute.return_value = StubResult(rowcount=1)
 
         result = await revoke_refresh_token(mock_session, "test_token")
 
         assert result is True
-        mock_session.delete.assert_called_once_with(mock_token)
-        mock_session.commit.assert_called_once()
+        mock_session.execute.assert_called_once()
+        mock_session.delete.assert_not_called()
 
-    @pytest.mark.asyncio
-    async def test_returns_false_for_nonexistent_token(self):
+    async def test_returns_false_for_nonexistent_token(self, mock_session: AsyncMock):
         """Test that nonexistent token returns False."""
-        mock_session = AsyncMock()
-
-        mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = None
-        mock_session.execute.return_value = mock_result
+        mock_session.execute.return_value = StubResult(rowcount=0)
 
         result = await revoke_refresh_token(mock_session, "nonexistent_token")
 
         assert result is False
         mock_session.delete.assert_not_called()
 
+    async def test_drops_token_cached_before_commit(
+        self, mock_session: AsyncMock, user_id: uuid.UUID
+    ):
+        """Test that a lookup caching the token mid-revocation is undone."""
+        token_hash = hash_token("racing_token")
+        mock_session.execute.return_value = StubResult(rowcount=1)
+        # A concurrent validate_refresh_token still sees the uncommitted row
+        mock_session.commit.side_effect = lambda: valid_refresh_tokens.put(
+            token_hash, user_id, 3600
+        )
+
+        await revoke_refresh_token(mock_session, "racing_token")
+
+        assert valid_refresh_tokens.get(token_hash) is None
+
 
 class TestRevokeAllUserRefreshTokens:
     """Tests for revoke_all_user_refresh_tokens function."""
 
-    @pytest.mark.asyncio
-    async def test_revokes_all_tokens_and_returns_count(self):
+    async def test_revokes_all_tokens_and_returns_count(
+        self, mock_session: AsyncMock, user_id: uuid.UUID
+    ):
         """Test that all user tokens are revoked and count is returned."""
-        mock_session = AsyncMock()
-        user_id = uuid.uuid4()
-
-        mock_result = MagicMock()
-        mock_result.rowcount = 5
-        mock_session.execute.return_value = mock_result
+        mock_session.execute.return_value = StubResult(rowcount=5)
 
         count = await revoke_all_user_refresh_tokens(mock_session, user_id)
 
         assert count == 5
         mock_session.execute.assert_called_once()
-        mock_session.commit.assert_called_once()
 
 
 class TestCleanupExpiredTokens:
     """Tests for cleanup_expired_tokens function."""
 
-    @pytest.mark.asyncio
-    async def test_deletes_expired_tokens_and_returns_count(self):
+    async def test_deletes_expired_tokens_and_returns_count(
+        self, mock_session: AsyncMock
+    ):
         """Test that expired tokens are deleted and count is returned."""
-        mock_session = AsyncMock()
-
-        mock_result = MagicMock()
-        mock_result.rowcount = 10
-        mock_session.execute.return_value = mock_result
+        mock_session.execute.return_value = StubResult(rowcount=10)
 
         count = await cleanup_expired_tokens(mock_session)
 
         assert count == 10
         mock_session.execute.assert_called_once()
+
+    async def test_deletes_in_batches(self, test_session):
+        """Test that a backlog larger than batch_size is fully deleted."""
+        user = User(email=f"user_{uuid.uuid4().hex[:8]}@example.com", hashed_password="x")
+        test_session.add(user)
+        await test_session.commit()
+        for _ in range(5):
+            await create_refresh_token(test_session, user.id, lifetime_seconds=-1)
+        valid = await create_refresh_token(test_session, user.id)
+
+        count = await cleanup_expired_tokens(test_session, batch_size=2)
+
+        assert count == 5
+        assert await validate_refresh_token(test_session, valid) == user.id
+
+
+class TestCommits:
+    """Each write helper ends its work with exactly one commit."""
+
+    @pytest.mark.parametrize("op", ["create", "revoke", "revoke_all", "cleanup"])
+    async def test_commits_once(
+        self, op: str, mock_session: AsyncMock, user_id: uuid.UUID
+    ):
+        """Test that the helper commits once (the DELETEs hit one row each)."""
+        mock_session.execute.return_value = StubResult(rowcount=1)
+        calls = {
+            "create": lambda: create_refresh_token(mock_session, user_id),
+            "revoke": lambda: revoke_refresh_token(mock_session, "token"),
+            "revoke_all": lambda: revoke_all_user_refresh_tokens(
+                mock_session, user_id
+            ),
+            "cleanup": lambda: cleanup_expired_tokens(mock_session),
+        }
+
+        await calls[op]()
+
         mock_session.commit.assert_called_once()
 
 
 class TestGetRefreshTokenCookieSettings:
     """Tests for get_refresh_token_cookie_settings function."""
 
-    def test_returns_dict_with_required_keys(self):
-        """Test that function returns dict with all required cookie settings."""
+    def test_settings_are_cached_per_lifetime(self):
+        """Test that the same lifetime reuses one settings dict."""
+        assert get_refresh_token_cookie_settings() is get_refresh_token_cookie_settings(
+            one.env.refresh_token_lifetime
+        )
+        assert get_refresh_token_cookie_settings(60)["max_age"] == 60
+
+    def test_default_settings(self):
+        """
+        Test the default settings: all required keys, HttpOnly, restricted to
+        the auth endpoints and max_age from config.refresh_token_lifetime.
+        """
         settings = get_refresh_token_cookie_settings()
 
         assert isinstance(settings, dict)
-        assert "key" in settings
-        assert "httponly" in settings
-        assert "secure" in settings
-        assert "samesite" in settings
-        assert "max_age" in settings
-        assert "path" in settings
-
-    def test_httponly_is_true(self):
-        """Test that httponly is True for security."""
-        settings = get_refresh_token_cookie_settings()
+        assert settings.keys() >= {
+            "key",
+            "httponly",
+            "secure",
+            "samesite",
+            "max_age",
+            "path",
+        }
         assert settings["httponly"] is True
-
-    def test_path_restricts_to_auth_endpoints(self):
-        """Test that cookie path is restricted to auth endpoints."""
-        settings = get_refresh_token_cookie_settings()
         assert settings["path"] == "/api/auth"
-
-    def test_default_max_age_uses_config(self):
-        """Test that default max_age uses config.refresh_token_lifetime."""
-        settings = get_refresh_token_cookie_settings()
         assert settings["max_age"] == one.env.refresh_token_lifetime
 
     def test_custom_lifetime_sets_max_age(self):
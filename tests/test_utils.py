@@ -1,10 +1,27 @@
 # -*- coding: utf-8 -*-
 
-from learn_fastapi_auth.utils import add_two
+import time
+import uuid
+
+from learn_fastapi_auth.utils import add_two, uuid7
 
 
 def test_add_two():
-    assert add_two(1, 2) == 3
+    for a, b, expected in [(1, 2, 3), (0, 0, 0), (-1, 1, 0), (10, 20, 30)]:
+        assert add_two(a, b) == expected
+
+
+def test_uuid7():
+    value = uuid7()
+    assert value.version == 7
+    assert value.variant == uuid.RFC_4122
+    # the leading 48 bits are the unix timestamp in milliseconds
+    assert abs((value.int >> 80) - time.time_ns() // 1_000_000) < 1000
+
+    first = uuid7()
+    time.sleep(0.002)
+    second = uuid7()
+    assert first < second
 
 
 if __name__ == "__main__":